@@ -1,26 +1,33 @@
 """
 @author: Arno
 @created: 2022-12-29
-@modified: 2023-05-20
+@modified: 2026-10-17
 
 Controller part for get prices of coins on website / exchanges
 
 """
 import argparse
 import re
+import sys
+from typing import Optional
 
 import config
 import src.db.DbHelper as DbHelper
 from src.controllers.CoinPriceController import CoinPriceController
+from src.controllers.CoinPriceMultiController import CoinPriceMultiController
 from src.data.CoinData import CoinData
 from src.data.DbData import DbWebsiteName
-from src.db.DbPostgresql import DbPostgresql
+from src.db.Db import Db
 from src.db.DbSqlite3 import DbSqlite3
+from src.models.CoinPrice import CoinPrice
 from src.models.CoinPriceAlcor import CoinPriceAlcor
 from src.models.CoinPriceCoingecko import CoinPriceCoingecko
 from src.models.CoinPriceCryptowatch import CoinPriceCryptowatch
 from src.views.CoinPriceViewCli import CoinPriceViewCli
 
+# websites used with option website all
+ALL_WEBSITES = [DbWebsiteName.COINGECKO, DbWebsiteName.CRYPTOWATCH, DbWebsiteName.ALCOR]
+
 
 def __main__():
     """Search assets and store in database"""
@@ -33,7 +40,48 @@ def __main__():
         default="2022-05-01T23:00",
     )
     argparser.add_argument(
-        "-w", "--website", type=str, help="Website / exchange to search on"
+        "-b",
+        "--backfill",
+        type=str,
+        nargs=2,
+        metavar=("START", "END"),
+        help="Write historical prices from start to end date to a csv or parquet file (option output) and exit, resumes an existing file",
+    )
+    argparser.add_argument(
+        "-s",
+        "--step",
+        type=str,
+        help="Step between dates of backfill: hour, day or week",
+        default="day",
+    )
+    argparser.add_argument(
+        "-m",
+        "--mode",
+        type=str,
+        choices=["now", "hist", "hist2", "all"],
+        help="Get prices without menu and exit, exit code 0 ok, 1 no prices, 2 output failed",
+    )
+    argparser.add_argument(
+        "-p",
+        "--poll",
+        type=float,
+        nargs="?",
+        const=0,
+        metavar="SECONDS",
+        help="Save current prices in the database every interval until interrupted, default interval from config",
+    )
+    argparser.add_argument(
+        "-o",
+        "--output",
+        type=str,
+        help="Outputs of mode, comma-separated: csv, xlsx, parquet and/or db. File type of backfill: csv or parquet",
+        default="csv",
+    )
+    argparser.add_argument(
+        "-w",
+        "--website",
+        type=str,
+        help="Website / exchange to search on, or all for all websites at once",
     )
     argparser.add_argument(
         "-c", "--coin", type=str, help="List of coins to search", required=False
@@ -52,6 +100,12 @@ def __main__():
         help="Cryptowatch: Maximum markets per pair, 0 is no max",
         default=0,
     )
+    argparser.add_argument(
+        "-ag",
+        "--aggregate",
+        action="store_true",
+        help="Cryptowatch: One volume weighted average price per pair over all exchanges",
+    )
     argparser.add_argument(
         "-ch",
         "--chain",
@@ -62,37 +116,90 @@ def __main__():
     args = argparser.parse_args()
     date = args.date
     coin_str = args.coin
-    strictness = args.strictness
-    max_markets_per_pair = args.max_markets_per_pair
-
-    # init session
-    search_website = str(args.website).lower()
-    chain_str = ""
-    if search_website == DbWebsiteName.ALCOR.name.lower():
-        cp = CoinPriceAlcor()
-        chain_str = args.chain if args.chain != None else "proton"
-    elif search_website == DbWebsiteName.CRYPTOWATCH.name.lower():
-        cp = CoinPriceCryptowatch(
-            strictness=strictness, max_markets_per_pair=max_markets_per_pair
-        )
-    else:
-        cp = CoinPriceCoingecko()
 
     # init session
     if config.DB_TYPE == "sqlite":
         db = DbSqlite3(config.DB_CONFIG)
     elif config.DB_TYPE == "postgresql":
+        # psycopg2 is only imported when used
+        from src.db.DbPostgresql import DbPostgresql
+
         db = DbPostgresql(config.DB_CONFIG)
     else:
         raise RuntimeError("No database configuration")
 
     # check if database and table coins exists and has values
     db.check_db()
-    view = CoinPriceViewCli()
-    app = CoinPriceController(view, cp, db)
+    view = CoinPriceViewCli(quiet=args.mode != None or args.poll != None)
+
+    search_website = str(args.website).lower()
+    if search_website == "all":
+        # all websites at once, each with its own controller and coins
+        websites = [website.name.lower() for website in ALL_WEBSITES]
+        controllers = [
+            CoinPriceController(view, get_price_prg(website, args), db)
+            for website in websites
+        ]
+        app = CoinPriceMultiController(view, controllers)
+        coin_data = {
+            control.get_website(): get_coin_data(
+                control.get_website(), control.price_prg, db, coin_str, args.chain
+            )
+            for control in controllers
+        }
+    else:
+        cp = get_price_prg(search_website, args)
+        app = CoinPriceController(view, cp, db)
+        coin_data = get_coin_data(search_website, cp, db, coin_str, args.chain)
+
+    if args.mode != None:
+        outputs = re.split("[;,]", args.output.lower())
+        sys.exit(
+            app.run_batch(coin_data=coin_data, date=date, mode=args.mode, outputs=outputs)
+        )
+    elif args.poll != None:
+        try:
+            app.run_poll(coin_data=coin_data, interval=args.poll)
+        except KeyboardInterrupt:
+            sys.exit("Stopped polling")
+    elif args.backfill != None:
+        start, end = args.backfill
+        app.run_backfill(
+            coin_data=coin_data,
+            start=start,
+            end=end,
+            step=args.step,
+            filetype=args.output.lower(),
+        )
+    else:
+        app.run(coin_data=coin_data, date=date)
+
+
+def get_price_prg(website: str, args: argparse.Namespace) -> CoinPrice:
+    """Get the price model of a website, default CoinGecko"""
+    if website == DbWebsiteName.ALCOR.name.lower():
+        return CoinPriceAlcor()
+    elif website == DbWebsiteName.CRYPTOWATCH.name.lower():
+        return CoinPriceCryptowatch(
+            strictness=args.strictness,
+            max_markets_per_pair=args.max_markets_per_pair,
+            aggregate=args.aggregate,
+        )
+    else:
+        return CoinPriceCoingecko()
+
+
+def get_coin_data(
+    website: str, cp: CoinPrice, db: Db, coin_str: Optional[str], chain: Optional[str]
+) -> list[CoinData]:
+    """Determine which coins to retrieve prices for
+
+    From arguments, from database, or take default
+    """
+    chain_str = ""
+    if website == DbWebsiteName.ALCOR.name.lower():
+        chain_str = chain if chain != None else "proton"
 
-    # Determine which coins to retrieve prices for
-    # From arguments, from database, or take default
     if coin_str != None:
         coins = re.split("[;,]", coin_str)
         coin_data = [CoinData(siteid=i, chain=chain_str, symbol=i) for i in coins]
@@ -104,7 +211,7 @@ def __main__():
         ]
     else:
         # providing default values for price retrieving
-        if search_website == DbWebsiteName.ALCOR.name.lower():
+        if website == DbWebsiteName.ALCOR.name.lower():
             coins = [
                 ["proton", "157"],
                 ["wax", "158"],
@@ -116,14 +223,13 @@ def __main__():
                 ["proton", "96"],
             ]
             coin_data = [CoinData(siteid=i[1], chain=i[0]) for i in coins]
-        elif search_website == DbWebsiteName.CRYPTOWATCH.name.lower():
+        elif website == DbWebsiteName.CRYPTOWATCH.name.lower():
             coins = ["btc", "ltc", "ada", "sol", "ardr", "xpr"]
             coin_data = [CoinData(siteid=i, symbol=i) for i in coins]
         else:
             coins = ["bitcoin", "litecoin", "cardano", "solana", "ardor", "proton"]
             coin_data = [CoinData(siteid=i) for i in coins]
-
-    app.run(coin_data=coin_data, date=date)
+    return coin_data
 
 
 if __name__ == "__main__":
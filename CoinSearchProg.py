@@ -1,7 +1,7 @@
 """
 @author: Arno
 @created: 2022-12-29
-@modified: 2023-05-20
+@modified: 2026-10-17
 
 Controller part for searching crypto coins on website / exchanges
 
@@ -12,7 +12,6 @@ import re
 import config
 from src.controllers.CoinSearchController import CoinSearchController
 from src.data.DbData import DbWebsiteName
-from src.db.DbPostgresql import DbPostgresql
 from src.db.DbSqlite3 import DbSqlite3
 from src.models.CoinSearch import SearchMethod
 from src.models.CoinSearchAlcor import CoinSearchAlcor
@@ -69,6 +68,9 @@ def __main__():
     if config.DB_TYPE == "sqlite":
         db = DbSqlite3(config.DB_CONFIG)
     elif config.DB_TYPE == "postgresql":
+        # psycopg2 is only imported when used
+        from src.db.DbPostgresql import DbPostgresql
+
         db = DbPostgresql(config.DB_CONFIG)
     else:
         raise RuntimeError("No database configuration")
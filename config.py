@@ -10,6 +10,40 @@ DB_CONFIG = {"dbname": "Arkofolio.db"}
 # Use / or \\ for folders
 OUTPUT_PATH = "output"
 IMAGE_PATH = "coinimages"
+CACHE_PATH = "cache"
+
+# Time in seconds to keep responses of current prices in the cache
+# Responses of historical prices are kept forever
+RESPONSE_CACHE_TTL = 60
+# Time in seconds to keep the markets of a coin (Cryptowatch) in the cache
+MARKETS_CACHE_TTL = 24 * 3600
+
+# Time in seconds after which the stored list of all assets is refreshed
+ASSETS_REFRESH_TIME = 24 * 3600
+
+# Number of dates retrieved and written at once when backfilling prices
+BACKFILL_BATCH_SIZE = 200
+
+# Seconds between current price requests per website when polling (CoinPriceProg -p)
+# Ticks are skipped when a request takes longer, polling does not use the cache
+PRICE_POLL_INTERVAL = {"coingecko": 60, "cryptowatch": 60, "alcor": 60}
+
+# Maximum number of concurrent requests per website
+REQUEST_MAX_CONCURRENCY = 8
+# Maximum number of open connections to one host (Alcor has a host per chain)
+REQUEST_MAX_PER_HOST = 4
+
+# Maximum number of requests per minute per website (0 is no limit)
+# Keep just under the limit of the website, to never get a 429 response
+COINGECKO_RATE_LIMIT = 28  # Demo API allows 30 calls per minute
+CRYPTOWATCH_RATE_LIMIT = 120  # Also limited by the allowance in the responses
+ALCOR_RATE_LIMIT = 55  # Per chain
+
+# Maximum number of ids or contracts and url length of one Coingecko request
+# (ids and contracts are split over more requests)
+COINGECKO_MAX_IDS = 250
+COINGECKO_MAX_CONTRACTS = 100
+COINGECKO_MAX_URL_PARAM = 4000
 
 COINGECKO_API_DEMO = ""  # Your Coingecko Demo API
 COINGECKO_URL = "https://api.coingecko.com/api/v3"
@@ -1,13 +1,15 @@
 """
 @author: Arno
 @created: 2022-12-29
-@modified: 2023-05-20
+@modified: 2026-10-17
 
 Controller part for get prices of coins on website / exchanges
 
 """
 import src.db.DbHelper as DbHelper
+from src.controllers.PricePoller import PricePoller
 from src.data.CoinData import CoinData, CoinPriceData
+from src.data.DbData import DbResultStatus
 from src.db.Db import Db
 from src.models.CoinPrice import CoinPrice
 from src.views.CoinPriceViewCli import CoinPriceViewCli
@@ -20,6 +22,8 @@ class CoinPriceController:
         self.view = view
         self.price_prg = price_prg
         self.db = db
+        if DbHelper.check_coin_table(self.db):
+            DbHelper.create_coin_index(self.db)
         self.price_prg.attach_view_update_progress(self.view.update_progress)
         self.price_prg.attach_view_update_progress_text(self.view.update_progress_text)
         self.price_prg.attach_view_update_waiting_time(self.view.update_waiting_time)
@@ -28,23 +32,53 @@ class CoinPriceController:
         )
         self.coin_data: list[CoinData] = []
         self.currency_data: list[str] = ["usd", "eur", "btc", "eth"]
+        self.poller = PricePoller(self.view)
 
     def get_website(self) -> str:
         return self.price_prg.website
 
     def get_price_current(self) -> list[CoinPriceData]:
         """Get current price"""
-        return self.price_prg.get_price_current(self.coin_data, self.currency_data)
+        return self.set_website(
+            self.price_prg.get_price_current(self.coin_data, self.currency_data)
+        )
 
     def get_price_hist(self, date: str) -> list[CoinPriceData]:
         """Get coingecko history price"""
-        return self.price_prg.get_price_hist(self.coin_data, self.currency_data, date)
+        return self.set_website(
+            self.price_prg.get_price_hist(self.coin_data, self.currency_data, date)
+        )
 
     def get_price_hist_marketchart(self, date: str) -> list[CoinPriceData]:
         """Get history price of a coin or a token"""
-        return self.price_prg.get_price_hist_marketchart(
-            self.coin_data, self.currency_data, date
+        return self.set_website(
+            self.price_prg.get_price_hist_marketchart(
+                self.coin_data, self.currency_data, date
+            )
+        )
+
+    def get_price_hist_marketchart_dates(
+        self, dates: list[str]
+    ) -> dict[str, list[CoinPriceData]]:
+        """Get history price of a coin or a token on multiple dates"""
+        prices = self.price_prg.get_price_hist_marketchart_dates(
+            self.coin_data, self.currency_data, dates
         )
+        return {date: self.set_website(prices_date) for date, prices_date in prices.items()}
+
+    def set_website(self, prices: list[CoinPriceData]) -> list[CoinPriceData]:
+        """Set the website as source of the prices"""
+        for price in prices:
+            price.website = self.price_prg.website
+        return prices
+
+    def get_coin_data(self) -> list[CoinData]:
+        """Get the coin data"""
+        return self.coin_data
+
+    def get_currency_data(self) -> list[str]:
+        """Get the currency data"""
+        return self.currency_data
 
     def set_currency_data(self, currency_data: list[str]) -> None:
         """Set the currency data manual"""
@@ -54,6 +88,31 @@ class CoinPriceController:
         """Set the coin data manual"""
         self.coin_data = coin_data
 
+    def save_price_data(self, price_data: list[CoinPriceData]) -> DbResultStatus:
+        """Save price data in the price table of the database
+
+        The tables are created if they don't exist
+        """
+        if not self.db.has_connection():
+            return DbResultStatus.NO_DATABASE
+
+        if not DbHelper.check_coin_table(self.db):
+            DbHelper.create_coin_table(self.db)
+        if not DbHelper.check_price_table(self.db):
+            DbHelper.create_price_table(self.db)
+
+        if self.price_prg.website_id == 0:
+            DbHelper.insert_website(self.db, self.price_prg.website)
+            self.price_prg.website_id = DbHelper.get_website_id(
+                self.db, self.price_prg.website
+            )
+
+        result = DbHelper.insert_prices(self.db, price_data, self.price_prg.website_id)
+        if result <= 0:
+            return DbResultStatus.INSERT_ERROR
+
+        return DbResultStatus.INSERT_OK
+
     def load_coin_data_db(self) -> None:
         """Retrieve the coin data in database"""
         if self.price_prg.website_id > 0:
@@ -71,3 +130,42 @@ class CoinPriceController:
         """
         self.coin_data = coin_data
         self.view.ui_root(self, date)
+
+    def run_backfill(
+        self,
+        coin_data: list[CoinData],
+        start: str,
+        end: str,
+        step: str,
+        filetype: str = "csv",
+    ):
+        """Get historical prices from start to end date and write to file"""
+        self.coin_data = coin_data
+        self.view.price_backfill(
+            self, start, end, step, self.view.str_to_filetype(filetype)
+        )
+
+    def run_batch(
+        self, coin_data: list[CoinData], date: str, mode: str, outputs: list[str]
+    ) -> int:
+        """Get prices without user input and write to the outputs
+
+        returns exit code, 0 is ok
+        """
+        self.coin_data = coin_data
+        return self.view.price_auto(self, date, mode, outputs)
+
+    def run_poll(self, coin_data: list[CoinData], interval: float = 0) -> None:
+        """Get current prices every interval and save them in the database
+
+        The website model is kept, so sessions, markets and caches stay loaded
+        Runs until stop is called or the program is interrupted, see PricePoller
+
+        interval = seconds between ticks, 0 is the interval in config of the website
+        """
+        self.coin_data = coin_data
+        self.poller.run([self], interval)
+
+    def stop(self) -> None:
+        """Stop polling after the current tick"""
+        self.poller.stop()
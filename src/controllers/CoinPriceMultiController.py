@@ -0,0 +1,190 @@
+"""
+@author: Arno
+@created: 2026-10-17
+@modified: 2026-10-17
+
+Controller part for get prices of coins on all websites / exchanges at once
+
+"""
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, TypeVar
+
+from src.controllers.CoinPriceController import CoinPriceController
+from src.controllers.PricePoller import PricePoller
+from src.data.CoinData import CoinData, CoinPriceData
+from src.data.DbData import DbResultStatus
+from src.views.CoinPriceViewCli import CoinPriceViewCli
+
+T = TypeVar("T")
+
+
+class CoinPriceMultiController:
+    """Controller for getting prices from more crypto exchanges at the same time
+
+    Every website has its own controller with its own model and request session
+    The websites are requested in parallel threads, so the total time
+    is the time of the slowest website
+    """
+
+    def __init__(
+        self, view: CoinPriceViewCli, controllers: list[CoinPriceController]
+    ) -> None:
+        self.view = view
+        self.controllers = controllers
+        self.poller = PricePoller(view)
+
+    def get_website(self) -> str:
+        return "all"
+
+    def _run_all(self, fn: Callable[[CoinPriceController], T]) -> list[T]:
+        """Run a function for all controllers in parallel threads
+
+        returns list with results in order of the controllers
+        """
+        with ThreadPoolExecutor(max_workers=len(self.controllers)) as executor:
+            return list(executor.map(fn, self.controllers))
+
+    @staticmethod
+    def merge_prices(results: list[list[CoinPriceData]]) -> list[CoinPriceData]:
+        """Merge prices of all websites to one list
+
+        Prices are unique per website, coin, currency and exchange,
+        the last price of a key is kept
+        """
+        prices: dict[tuple, CoinPriceData] = {}
+        for result in results:
+            for price in result:
+                key = (
+                    price.website,
+                    price.coin.chain,
+                    price.coin.siteid,
+                    price.curr,
+                    price.exchange,
+                )
+                prices[key] = price
+        return list(prices.values())
+
+    def get_price_current(self) -> list[CoinPriceData]:
+        """Get current price on all websites"""
+        return self.merge_prices(
+            self._run_all(lambda control: control.get_price_current())
+        )
+
+    def get_price_hist(self, date: str) -> list[CoinPriceData]:
+        """Get history price on all websites, only CoinGecko has this method"""
+        return self.merge_prices(
+            self._run_all(lambda control: control.get_price_hist(date))
+        )
+
+    def get_price_hist_marketchart(self, date: str) -> list[CoinPriceData]:
+        """Get history price of a coin or a token on all websites"""
+        return self.merge_prices(
+            self._run_all(lambda control: control.get_price_hist_marketchart(date))
+        )
+
+    def get_price_hist_marketchart_dates(
+        self, dates: list[str]
+    ) -> dict[str, list[CoinPriceData]]:
+        """Get history price of a coin or a token on multiple dates on all websites"""
+        results = self._run_all(
+            lambda control: control.get_price_hist_marketchart_dates(dates)
+        )
+        return {
+            date: self.merge_prices([result.get(date, []) for result in results])
+            for date in dates
+        }
+
+    def get_coin_data(self) -> list[CoinData]:
+        """Get the coin data of all websites"""
+        return [coin for control in self.controllers for coin in control.get_coin_data()]
+
+    def get_currency_data(self) -> list[str]:
+        """Get the currency data of all websites"""
+        return list(
+            dict.fromkeys(
+                curr for control in self.controllers for curr in control.get_currency_data()
+            )
+        )
+
+    def set_currency_data(self, currency_data: list[str]) -> None:
+        """Set the currency data manual for all websites"""
+        for control in self.controllers:
+            control.set_currency_data(currency_data)
+
+    def set_coin_data(self, coin_data: list[CoinData]) -> None:
+        """Set the coin data manual for all websites"""
+        for control in self.controllers:
+            control.set_coin_data(coin_data)
+
+    def set_coin_data_website(self, coin_data: dict[str, list[CoinData]]) -> None:
+        """Set the coin data per website
+
+        coin_data = dictionary with website: list of CoinData
+        """
+        for control in self.controllers:
+            if control.get_website() in coin_data:
+                control.set_coin_data(coin_data[control.get_website()])
+
+    def load_coin_data_db(self) -> None:
+        """Retrieve the coin data in database for all websites"""
+        for control in self.controllers:
+            control.load_coin_data_db()
+
+    def save_price_data(self, price_data: list[CoinPriceData]) -> DbResultStatus:
+        """Save price data of every website in the price table of the database
+
+        The database is only used from this thread
+        """
+        result = DbResultStatus.INSERT_OK
+        for control in self.controllers:
+            prices = [
+                price for price in price_data if price.website == control.get_website()
+            ]
+            if prices != []:
+                result_website = control.save_price_data(prices)
+                if result_website != DbResultStatus.INSERT_OK:
+                    result = result_website
+        return result
+
+    def run(self, coin_data: dict[str, list[CoinData]], date: str):
+        """Start the UI for all websites"""
+        self.set_coin_data_website(coin_data)
+        self.view.ui_root(self, date)
+
+    def run_batch(
+        self, coin_data: dict[str, list[CoinData]], date: str, mode: str, outputs: list[str]
+    ) -> int:
+        """Get prices on all websites without user input and write to the outputs
+
+        returns exit code, 0 is ok
+        """
+        self.set_coin_data_website(coin_data)
+        return self.view.price_auto(self, date, mode, outputs)
+
+    def run_backfill(
+        self,
+        coin_data: dict[str, list[CoinData]],
+        start: str,
+        end: str,
+        step: str,
+        filetype: str = "csv",
+    ):
+        """Get historical prices on all websites from start to end date and write to file"""
+        self.set_coin_data_website(coin_data)
+        self.view.price_backfill(
+            self, start, end, step, self.view.str_to_filetype(filetype)
+        )
+
+    def run_poll(self, coin_data: dict[str, list[CoinData]], interval: float = 0) -> None:
+        """Get current prices on all websites every interval and save them in the database
+
+        Every website has its own tick schedule, see PricePoller
+
+        interval = seconds between ticks for all websites, 0 is the interval in config per website
+        """
+        self.set_coin_data_website(coin_data)
+        self.poller.run(self.controllers, interval)
+
+    def stop(self) -> None:
+        """Stop polling after the current ticks"""
+        self.poller.stop()
@@ -1,7 +1,7 @@
 """
 @author: Arno
 @created: 2022-12-29
-@modified: 2023-05-20
+@modified: 2026-10-17
 
 Controller part for searching crypto coins on website / exchanges
 
@@ -21,6 +21,8 @@ class CoinSearchController:
         self.view = view
         self.search_prg = search_prg
         self.db = db
+        if DbHelper.check_coin_table(self.db):
+            DbHelper.create_coin_index(self.db)
         self.search_prg.website_id = DbHelper.get_website_id(
             self.db, self.search_prg.website
         )
@@ -89,6 +91,62 @@ class CoinSearchController:
         self.search_prg.save_images(images_urls, coin.coin.name)
         return DbResultStatus.INSERT_OK
 
+    def delete_coins(self, coins: list[CoinData]) -> tuple[DbResultStatus, int]:
+        """Delete multiple coins from database in one transaction
+
+        returns status and number of coins deleted
+        """
+        if not self.db.has_connection():
+            return DbResultStatus.NO_DATABASE, 0
+
+        if not DbHelper.check_coin_table(self.db):
+            return DbResultStatus.NO_TABLE, 0
+
+        website_id = self.search_prg.get_website_id(self.db)
+
+        siteids = list({coin.siteid for coin in coins})
+        try:
+            DbHelper.delete_coins(self.db, siteids, website_id)
+        except Exception as e:
+            print(e)
+            return DbResultStatus.DELETE_ERROR, 0
+
+        return DbResultStatus.DELETE_OK, len(siteids)
+
+    def insert_coins(self, coins: list[CoinSearchData]) -> tuple[DbResultStatus, int]:
+        """Insert multiple coins in database in one transaction
+
+        Coins already in the table are skipped, no images are saved
+
+        returns status and number of coins inserted
+        """
+        if not self.db.has_connection():
+            return DbResultStatus.NO_DATABASE, 0
+
+        if not DbHelper.check_coin_table(self.db):
+            DbHelper.create_coin_table(self.db)
+
+        website_id = self.search_prg.get_website_id(self.db)
+
+        # skip coins already in the table or twice in the list
+        siteids = {str(i[0]) for i in DbHelper.get_coins(self.db, "", website_id)}
+        new_coins: list[CoinData] = []
+        for coin in coins:
+            if str(coin.coin.siteid) not in siteids:
+                siteids.add(str(coin.coin.siteid))
+                new_coins.append(coin.coin)
+
+        if len(new_coins) == 0:
+            return DbResultStatus.COIN_EXISTS, 0
+
+        try:
+            DbHelper.insert_coins(self.db, new_coins, website_id)
+        except Exception as e:
+            print(e)
+            return DbResultStatus.INSERT_ERROR, 0
+
+        return DbResultStatus.INSERT_OK, len(new_coins)
+
     def toggle_search_method(self) -> None:
         """Change the search method
         In case the search program has multiple (Coingecko)
@@ -100,3 +158,12 @@ class CoinSearchController:
 
     def get_search_method(self) -> SearchMethod:
         return self.search_prg.search_method
+
+    def toggle_search_regex(self) -> None:
+        """Change between prefix search and regular expression search
+        of the assets
+        """
+        self.search_prg.set_search_regex(not self.search_prg.search_regex)
+
+    def get_search_regex(self) -> bool:
+        return self.search_prg.search_regex
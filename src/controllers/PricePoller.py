@@ -0,0 +1,119 @@
+"""
+@author: Arno
+@created: 2026-10-17
+@modified: 2026-10-17
+
+Polling current prices of one or more websites and saving them in the database
+
+"""
+import math
+import queue
+import threading
+import time
+from typing import TYPE_CHECKING, Optional
+
+import config
+from src.data.CoinData import CoinPriceData
+from src.data.DbData import DbResultStatus
+from src.views.CoinPriceViewCli import CoinPriceViewCli
+
+if TYPE_CHECKING:
+    from src.controllers.CoinPriceController import CoinPriceController
+
+
+class PricePoller:
+    """Get current prices of websites every interval and save them in the database
+
+    Every website is requested in its own thread with its own tick schedule,
+    so a slow website does not delay the others
+    When getting the prices takes longer than the interval, the missed ticks
+    are skipped instead of run afterwards
+    The prices are saved in the thread calling run, so the database is only
+    used from that thread
+    """
+
+    def __init__(self, view: CoinPriceViewCli) -> None:
+        self.view = view
+        self.stop_event = threading.Event()
+
+    def run(self, controllers: list["CoinPriceController"], interval: float = 0) -> None:
+        """Poll the websites of the controllers until stop is called or interrupted
+
+        The response cache is not used for current prices while polling,
+        so every tick has new prices
+
+        interval = seconds between ticks for all websites,
+                   0 is the interval in config per website
+        """
+        self.stop_event.clear()
+        results: queue.Queue = queue.Queue()
+        threads = []
+        for control in controllers:
+            control.price_prg.set_cache_current(False)
+            interval_website = interval
+            if interval_website <= 0:
+                interval_website = config.PRICE_POLL_INTERVAL.get(control.get_website(), 60)
+            threads.append(
+                threading.Thread(
+                    target=self._poll_website,
+                    args=(control, interval_website, results),
+                    daemon=True,
+                )
+            )
+
+        try:
+            for thread in threads:
+                thread.start()
+            while any(thread.is_alive() for thread in threads) or not results.empty():
+                try:
+                    control, prices, error = results.get(timeout=0.5)
+                except queue.Empty:
+                    continue
+                self._save_tick(control, prices, error)
+        finally:
+            # also stop the websites after an interrupt
+            self.stop_event.set()
+            for control in controllers:
+                control.price_prg.set_cache_current(True)
+
+    def _poll_website(
+        self, control: "CoinPriceController", interval: float, results: queue.Queue
+    ) -> None:
+        """Get the current prices of one website every interval
+
+        Prices or the error of every tick are put in results as
+        (controller, list of CoinPriceData, error message)
+        """
+        next_tick = time.monotonic()
+        while not self.stop_event.is_set():
+            prices: list[CoinPriceData] = []
+            error = ""
+            try:
+                prices = control.get_price_current()
+            except Exception as e:
+                # one bad response must not stop polling
+                error = f"{type(e).__name__}: {e}"
+            results.put((control, prices, error))
+
+            # next tick in the future, skipping ticks already passed
+            now = time.monotonic()
+            next_tick += interval
+            if next_tick < now:
+                next_tick += math.ceil((now - next_tick) / interval) * interval
+            self.stop_event.wait(next_tick - now)
+
+    def _save_tick(
+        self, control: "CoinPriceController", prices: list[CoinPriceData], error: str
+    ) -> None:
+        """Save the prices of one tick of a website and show the result"""
+        result: Optional[DbResultStatus] = None
+        if error == "" and prices != []:
+            try:
+                result = control.save_price_data(prices)
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+        self.view.show_poll_result(control.get_website(), len(prices), result, error)
+
+    def stop(self) -> None:
+        """Stop polling after the current ticks"""
+        self.stop_event.set()
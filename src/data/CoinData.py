@@ -1,7 +1,7 @@
 """
 @author: Arno
 @created: 2022-11-20
-@modified: 2023-05-20
+@modified: 2026-10-17
 
 Data Classes for Coin data
 
@@ -44,6 +44,7 @@ class CoinPriceData:
     volume: float = 0
     active: bool = True
     error: str = ''
+    website: str = ''  # source of the price
 
 
 @dataclass
@@ -1,7 +1,7 @@
 """
 @author: Arno
 @created: 2022-12-26
-@modified: 2023-05-20
+@modified: 2026-10-17
 
 Data enumerations for view
 
@@ -28,6 +28,7 @@ class OutputFileType(Enum):
     """
     XLSX = auto()
     CSV = auto()
+    PARQUET = auto()
 
 
 class PriceFunction(Enum):
@@ -36,6 +37,7 @@ class PriceFunction(Enum):
     CURRENT = 'Current'
     HISTORICAL_SIMPLE = 'HistSimple'
     HISTORICAL_MARKETCHART = 'HistMarketchart'
+    BACKFILL = 'Backfill'
 
 
 class SearchFunction(Enum):
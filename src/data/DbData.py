@@ -1,7 +1,7 @@
 """
 @author: Arno
 @created: 2022-05-05
-@modified: 2023-05-20
+@modified: 2026-10-17
 
 Data enumerations for database 
 
@@ -22,6 +22,7 @@ class DbTableName(Enum):
     """
     COIN = 'coin'
     WEBSITE = 'website'
+    PRICE = 'price'
 
 class DbResultStatus(Enum):
     """Class for enumerating status
@@ -0,0 +1,160 @@
+"""
+@author: Arno
+@created: 2026-10-17
+@modified: 2026-10-17
+
+Columnar container for price data
+
+"""
+import math
+from array import array
+from datetime import datetime
+from typing import TYPE_CHECKING, Hashable, Iterable, Optional
+
+from src.data.CoinData import CoinData, CoinPriceData
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+class PriceBatch:
+    """Price data stored per column instead of a list of CoinPriceData
+
+    Numbers are kept in arrays, text columns and coins as codes to a list of
+    unique values, so a large batch uses little memory and is converted to a
+    DataFrame without copying every row
+
+    The DataFrame has the same columns as json_normalize of CoinPriceData
+    """
+
+    def __init__(self) -> None:
+        self.timestamps = array("q")  # microseconds, utc
+        self.prices = array("d")
+        self.volumes = array("d")
+        self.active = array("b")
+        self.coin_codes = array("l")
+        self.curr_codes = array("l")
+        self.exchange_codes = array("l")
+        self.error_codes = array("l")
+        self.website_codes = array("l")
+        self.coins: dict[tuple, int] = {}
+        self.currs: dict[str, int] = {}
+        self.exchanges: dict[str, int] = {}
+        self.errors: dict[str, int] = {}
+        self.websites: dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    @staticmethod
+    def _get_code(categories: dict, value: Hashable) -> int:
+        """Get code of a value, a new value gets the next code"""
+        code = categories.get(value)
+        if code is None:
+            code = len(categories)
+            categories[value] = code
+        return code
+
+    def append(
+        self,
+        date: datetime,
+        coin: CoinData,
+        curr: str,
+        price: float,
+        volume: float = math.nan,
+        exchange: str = "",
+        active: bool = True,
+        error: str = "",
+        website: str = "",
+    ) -> None:
+        """Add one price to the batch
+
+        date = date of the price, without timezone it is local time
+        """
+        self.timestamps.append(round(date.timestamp() * 1_000_000))
+        self.prices.append(price)
+        self.volumes.append(volume)
+        self.active.append(active)
+        coin_key = (coin.siteid, coin.name, coin.symbol, coin.chain, coin.base)
+        self.coin_codes.append(self._get_code(self.coins, coin_key))
+        self.curr_codes.append(self._get_code(self.currs, curr))
+        self.exchange_codes.append(self._get_code(self.exchanges, exchange))
+        self.error_codes.append(self._get_code(self.errors, error))
+        self.website_codes.append(self._get_code(self.websites, website))
+
+    def add(self, price: CoinPriceData) -> None:
+        """Add a CoinPriceData to the batch"""
+        self.append(
+            date=price.date,
+            coin=price.coin,
+            curr=price.curr,
+            price=price.price,
+            volume=price.volume,
+            exchange=price.exchange,
+            active=price.active,
+            error=price.error,
+            website=price.website,
+        )
+
+    def extend(self, prices: Iterable[CoinPriceData]) -> None:
+        """Add a list of CoinPriceData to the batch"""
+        for price in prices:
+            self.add(price)
+
+    @classmethod
+    def from_prices(cls, prices: Iterable[CoinPriceData]) -> "PriceBatch":
+        """Make a batch from a list of CoinPriceData"""
+        batch = cls()
+        batch.extend(prices)
+        return batch
+
+    def to_dataframe(self, tz: Optional[str] = "UTC") -> "pd.DataFrame":
+        """Get the batch as DataFrame
+
+        Number columns are views on the arrays of the batch, text columns are
+        categorical, coin columns are taken from the list of unique coins
+
+        tz = timezone of column date, None is without timezone (for excel)
+        """
+        import numpy as np
+        import pandas as pd
+
+        def categorical(codes: array, categories: dict) -> pd.Categorical:
+            return pd.Categorical.from_codes(
+                np.frombuffer(codes, dtype=np.dtype(codes.typecode)),
+                categories=pd.Index(list(categories), dtype=object),
+            )
+
+        timestamps = np.frombuffer(self.timestamps, dtype=np.int64)
+        dates = pd.to_datetime(timestamps, unit="us", utc=True)
+        dates = dates.tz_convert(tz) if tz is not None else dates.tz_localize(None)
+
+        columns = {
+            "date": dates,
+            "curr": categorical(self.curr_codes, self.currs),
+            "exchange": categorical(self.exchange_codes, self.exchanges),
+            "price": np.frombuffer(self.prices, dtype=np.float64),
+            "volume": np.frombuffer(self.volumes, dtype=np.float64),
+            "active": np.frombuffer(self.active, dtype=np.int8).astype(bool),
+            "error": categorical(self.error_codes, self.errors),
+            "website": categorical(self.website_codes, self.websites),
+        }
+
+        # coin fields per unique coin, expanded with the coin codes
+        coin_codes = np.frombuffer(self.coin_codes, dtype=np.dtype(self.coin_codes.typecode))
+        coin_fields = ["siteid", "name", "symbol", "chain", "base"]
+        for nr, coin_field in enumerate(coin_fields):
+            values: dict[str, int] = {}
+            field_codes = np.array(
+                [
+                    -1 if coin_key[nr] is None else self._get_code(values, coin_key[nr])
+                    for coin_key in self.coins
+                ],
+                dtype=np.int64,
+            )
+            columns[f"coin.{coin_field}"] = pd.Categorical.from_codes(
+                field_codes[coin_codes] if len(coin_codes) > 0 else coin_codes,
+                categories=pd.Index(list(values), dtype=object),
+            )
+
+        return pd.DataFrame(columns, copy=False)
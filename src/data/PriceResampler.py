@@ -0,0 +1,157 @@
+"""
+@author: Arno
+@created: 2026-10-17
+@modified: 2026-10-17
+
+Resampling of price points to candles (OHLCV) at several resolutions
+
+"""
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# columns of points and candles
+TIMESTAMP, OPEN, HIGH, LOW, CLOSE, VOLUME = range(6)
+
+# 1970-01-01 is a thursday, weeks start on monday
+WEEK = 7 * 24 * 3600
+WEEK_OFFSET = 4 * 24 * 3600
+
+
+class PriceResampler:
+    """Candles of one price series at several resolutions
+
+    The points of a download are kept, all resolutions are made from them
+    When newer points are added, only the last candle and new candles are
+    calculated again
+
+    resolutions = list of candle lengths in sec, for example 300, 3600, 86400
+    volume_sum = volume of a candle is the sum of the points, when False the
+                 volume of the last point (for a rolling 24h volume, Coingecko)
+    points and candles are 2d arrays with columns timestamp (sec), open, high,
+    low, close, volume, the timestamp of a candle is the start time
+    """
+
+    def __init__(self, resolutions: list[int], volume_sum: bool = True) -> None:
+        self.resolutions = list(resolutions)
+        self.volume_sum = volume_sum
+        self.points = np.empty((0, 6))
+        self.candles: dict[int, np.ndarray] = {
+            resolution: np.empty((0, 6)) for resolution in resolutions
+        }
+
+    def __len__(self) -> int:
+        return len(self.points)
+
+    @staticmethod
+    def get_buckets(timestamps: np.ndarray, resolution: int) -> np.ndarray:
+        """Get the start time of the candle of every timestamp"""
+        offset = WEEK_OFFSET if resolution % WEEK == 0 else 0
+        return (timestamps - offset) // resolution * resolution + offset
+
+    def set_resolutions(self, resolutions: list[int]) -> None:
+        """Add resolutions, the candles of new resolutions are made from all points"""
+        for resolution in resolutions:
+            if resolution not in self.candles:
+                self.resolutions.append(resolution)
+                self.candles[resolution] = self.resample(
+                    self.points, resolution, self.volume_sum
+                )
+
+    @classmethod
+    def resample(
+        cls, points: np.ndarray, resolution: int, volume_sum: bool = True
+    ) -> np.ndarray:
+        """Make candles of sorted points
+
+        open is the first, close the last value, high and low ignore missing
+        values (nan), volume is the sum of the points or the last volume
+        """
+        if len(points) == 0:
+            return np.empty((0, 6))
+        buckets = cls.get_buckets(points[:, TIMESTAMP], resolution)
+        starts = np.flatnonzero(np.diff(buckets)) + 1
+        firsts = np.concatenate(([0], starts))
+        lasts = np.concatenate((starts - 1, [len(points) - 1]))
+
+        candles = np.empty((len(firsts), 6))
+        candles[:, TIMESTAMP] = buckets[firsts]
+        candles[:, OPEN] = points[firsts, OPEN]
+        candles[:, HIGH] = np.fmax.reduceat(points[:, HIGH], firsts)
+        candles[:, LOW] = np.fmin.reduceat(points[:, LOW], firsts)
+        candles[:, CLOSE] = points[lasts, CLOSE]
+        if volume_sum:
+            candles[:, VOLUME] = np.add.reduceat(np.nan_to_num(points[:, VOLUME]), firsts)
+        else:
+            candles[:, VOLUME] = points[lasts, VOLUME]
+        return candles
+
+    def add(self, points: np.ndarray) -> None:
+        """Add points and update the candles of all resolutions
+
+        Points with a timestamp already in the series replace the old points
+
+        points = 2d array with columns timestamp, open, high, low, close, volume
+        """
+        if len(points) == 0:
+            return
+        points = points[np.argsort(points[:, TIMESTAMP], kind="stable")]
+        points = points[np.append(np.diff(points[:, TIMESTAMP]) != 0, True)]
+        ts_first = points[0, TIMESTAMP]
+
+        if len(self.points) > 0 and ts_first < self.points[-1, TIMESTAMP]:
+            # older points, merge and calculate all candles again
+            merged = np.concatenate((self.points, points))
+            merged = merged[np.argsort(merged[:, TIMESTAMP], kind="stable")]
+            # keep the last (newest added) point of the same timestamp
+            keep = np.append(np.diff(merged[:, TIMESTAMP]) != 0, True)
+            self.points = merged[keep]
+            for resolution in self.resolutions:
+                self.candles[resolution] = self.resample(
+                    self.points, resolution, self.volume_sum
+                )
+            return
+
+        # newer points, only the last candle can change
+        cut = np.searchsorted(self.points[:, TIMESTAMP], ts_first)
+        self.points = np.concatenate((self.points[:cut], points))
+        for resolution in self.resolutions:
+            candles = self.candles[resolution]
+            if len(candles) == 0:
+                self.candles[resolution] = self.resample(
+                    self.points, resolution, self.volume_sum
+                )
+                continue
+            start = np.searchsorted(self.points[:, TIMESTAMP], candles[-1, TIMESTAMP])
+            self.candles[resolution] = np.concatenate(
+                (
+                    candles[:-1],
+                    self.resample(self.points[start:], resolution, self.volume_sum),
+                )
+            )
+
+    def to_dataframe(
+        self, resolution: int, ts_from: float = -np.inf, ts_to: float = np.inf
+    ) -> "pd.DataFrame":
+        """Get the candles of a resolution as DataFrame
+
+        ts_from, ts_to = only the candles with a point in this time range (sec)
+        returns DataFrame with columns date (utc), open, high, low, close, volume
+        """
+        import pandas as pd
+
+        candles = self.candles[resolution]
+        if np.isfinite(ts_from):
+            # the candle of ts_from starts before ts_from
+            ts_from = self.get_buckets(np.array([ts_from]), resolution)[0]
+        candles = candles[
+            (candles[:, TIMESTAMP] >= ts_from) & (candles[:, TIMESTAMP] <= ts_to)
+        ]
+        df = pd.DataFrame(candles[:, OPEN:], columns=["open", "high", "low", "close", "volume"])
+        df.insert(
+            0, "date", pd.to_datetime(candles[:, TIMESTAMP].astype(np.int64), unit="s", utc=True)
+        )
+        return df
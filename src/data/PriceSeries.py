@@ -0,0 +1,68 @@
+"""
+@author: Arno
+@created: 2026-10-17
+@modified: 2026-10-17
+
+Data Class for a price time series of one market
+
+"""
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from typing import Optional
+
+
+@dataclass
+class PriceSeries:
+    """Dataclass for prices of one coin in one currency, sorted on timestamp
+
+    timestamps are in seconds
+    windows are the time ranges (from, to) that are retrieved from the website
+    """
+    timestamps: list[int] = field(default_factory=list)
+    prices: list[float] = field(default_factory=list)
+    volumes: list[float] = field(default_factory=list)
+    windows: list[tuple[int, int]] = field(default_factory=list)
+    error: str = ''
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    def add(self, timestamps: list[int], prices: list[float], volumes: list[float],
+            ts_from: int, ts_to: int) -> None:
+        """Add points of a retrieved time range to the series
+
+        Points with the same timestamp are replaced by the new ones
+        """
+        points = dict(zip(self.timestamps, zip(self.prices, self.volumes)))
+        points.update(zip(timestamps, zip(prices, volumes)))
+        self.timestamps = sorted(points)
+        self.prices = [points[ts][0] for ts in self.timestamps]
+        self.volumes = [points[ts][1] for ts in self.timestamps]
+
+        # merge overlapping windows
+        windows = sorted(self.windows + [(ts_from, ts_to)])
+        self.windows = [windows[0]]
+        for start, end in windows[1:]:
+            last_start, last_end = self.windows[-1]
+            if start <= last_end:
+                self.windows[-1] = (last_start, max(last_end, end))
+            else:
+                self.windows.append((start, end))
+
+    def covers(self, ts_from: int, ts_to: int) -> bool:
+        """Check if the time range is already retrieved"""
+        return any(start <= ts_from and ts_to <= end for start, end in self.windows)
+
+    def nearest(self, ts: int) -> Optional[tuple[int, float, float]]:
+        """Search for the point with the smallest time difference
+
+        Binary search in the sorted timestamps
+        returns (timestamp, price, volume) or None when series is empty
+        """
+        if len(self.timestamps) == 0:
+            return None
+        i = bisect_left(self.timestamps, ts)
+        if i == len(self.timestamps) or (
+                i > 0 and ts - self.timestamps[i - 1] <= self.timestamps[i] - ts):
+            i -= 1
+        return (self.timestamps[i], self.prices[i], self.volumes[i])
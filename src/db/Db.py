@@ -1,12 +1,13 @@
 """
 @author: Arno
 @created: 2022-11-03
-@modified: 2023-05-20
+@modified: 2026-10-17
 
 Database Helper Utilities Class
 
 """
 from abc import ABC, abstractmethod
+from contextlib import contextmanager
 
 
 class Db(ABC):
@@ -19,6 +20,7 @@ class Db(ABC):
     def __init__(self, config: dict):
         self.conn = None
         self.config = config
+        self.transaction_level: int = 0
 
     def __enter__(self):
         try:
@@ -126,6 +128,33 @@ class Db(ABC):
         cursor.close()
         return result
 
+    def executemany(self, sql: str, seq_params) -> int:
+        """Execute a query for every set of parameters
+
+        sql = query to execute,
+        seq_params = list of tuples for parameters in query
+        return value = rowcount or total changes
+        """
+        cursor = self.conn.cursor()  # type: ignore
+        cursor.executemany(sql, seq_params)
+        result = self.get_execute_result(cursor)
+        cursor.close()
+        return result
+
+    def insert_many(self, table: str, columns: list[str], rows: list[tuple]) -> int:
+        """Insert rows in bulk
+
+        Database types with a faster bulk insert can override this method
+
+        table = name of the table
+        columns = names of the columns
+        rows = list of tuples with values in order of columns
+        return value = rowcount or total changes
+        """
+        placeholders = ','.join('?' * len(columns))
+        sql = f'INSERT INTO {table} ({", ".join(columns)}) VALUES({placeholders})'
+        return self.executemany(sql, rows)
+
     def query(self, sql: str, params=None):
         """Execute a query and returns the result
 
@@ -144,7 +173,34 @@ class Db(ABC):
         return result
 
     def commit(self):
-        self.conn.commit()  # type: ignore
+        """Commit changes, postponed till the end when inside a transaction block
+        """
+        if self.transaction_level == 0:
+            self.conn.commit()  # type: ignore
+
+    @contextmanager
+    def transaction(self):
+        """Context manager to do many changes in one transaction
+
+        Commits at the end of the block, rolls back when an exception occurs.
+        Commits inside the block are postponed till the end.
+
+        usage:
+            with db.transaction():
+                DbHelper.insert_coin(db, ...)
+                DbHelper.insert_coin(db, ...)
+        """
+        self.transaction_level += 1
+        try:
+            yield self
+        except BaseException:
+            self.transaction_level -= 1
+            if self.transaction_level == 0:
+                self.rollback()
+            raise
+        else:
+            self.transaction_level -= 1
+            self.commit()
 
     def rollback(self):
         self.conn.rollback()  # type: ignore
@@ -152,6 +208,33 @@ class Db(ABC):
     def has_connection(self):
         return self.conn != None
 
+    @abstractmethod
+    def get_queries_create_coin_index(self, table: str) -> list[str]:
+        """Get the queries to create the indexes for searching the coin table
+
+        The queries must be safe to run on an existing database
+        """
+        pass
+
+    def get_query_search_coins(self, table: str, search: str, website_id: int) -> tuple[str, tuple]:
+        """Get the query and arguments for searching coins on a part of
+        siteid, name, symbol or base
+
+        Database types with a full text search can override this method
+
+        return value = query, arguments
+        """
+        query = f'''SELECT siteid, name, symbol, chain, base FROM {table} WHERE
+                    website_id = ? AND
+                    (siteid like ? or
+                    name like ? or
+                    symbol like ? or
+                    base like ?
+                    )
+                '''
+        args = (website_id,) + (f'%{search}%',)*4
+        return query, args
+
     @abstractmethod
     def get_create_primary_key_str(self) -> str:
         """Get the string to create a primary key for the specific database type
@@ -1,14 +1,14 @@
 """
 @author: Arno
 @created: 2022-11-03
-@modified: 2023-05-20
+@modified: 2026-10-17
 
 Database Helper function to create tables
 
 """
 from enum import Enum, auto
 
-from src.data.CoinData import CoinData
+from src.data.CoinData import CoinData, CoinPriceData
 from src.data.DbData import DbTableName
 from src.db.Db import Db
 
@@ -38,6 +38,48 @@ def create_coin_table(db: Db):
                 )
             '''
     db.execute(query)
+    create_coin_index(db)
+
+
+def create_coin_index(db: Db):
+    """Create the indexes for looking up and searching coins
+
+    Can be used on an existing coin table
+    """
+    try:
+        with db.transaction():
+            for query in db.get_queries_create_coin_index(DbTableName.COIN.value):
+                db.execute(query)
+    except Exception as e:
+        print(f'Unable to create coin index: {e}')
+
+
+def create_price_table(db: Db):
+    """Create a price table with an index on coin, currency and timestamp
+
+    timestamp is in seconds
+    """
+    primary_key = db.get_create_primary_key_str()
+    query = f'''CREATE TABLE {DbTableName.PRICE.value} (
+                id {primary_key},
+                website_id INTEGER NOT NULL,
+                coin VARCHAR(80) NOT NULL,
+                chain VARCHAR(80),
+                curr VARCHAR(80) NOT NULL,
+                exchange VARCHAR(80),
+                timestamp BIGINT NOT NULL,
+                price DOUBLE PRECISION,
+                volume DOUBLE PRECISION,
+                error VARCHAR(200),
+                CONSTRAINT FK_Website_Price FOREIGN KEY (website_id) REFERENCES {DbTableName.WEBSITE.value}(id)
+                )
+            '''
+    db.execute(query)
+    query = f'''CREATE INDEX idx_price_coin_curr_timestamp
+                ON {DbTableName.PRICE.value} (coin, curr, timestamp)
+            '''
+    db.execute(query)
+    db.commit()
 
 
 def insert_website(db: Db, website: str) -> int:
@@ -79,6 +121,23 @@ def insert_coin(db: Db, coin: CoinData, website_id: int) -> int:
     return res
 
 
+def insert_coins(db: Db, coins: list[CoinData], website_id: int) -> int:
+    """Insert new coins to the coins table in one transaction
+
+    return value = rowcount or total changes 
+    """
+    columns = ['website_id', 'siteid', 'name', 'symbol', 'chain', 'base']
+    rows = [(website_id,
+             coin.siteid,
+             coin.name,  # also quote
+             coin.symbol,  # also quote symbol
+             coin.chain,
+             coin.base) for coin in coins]
+    with db.transaction():
+        res = db.insert_many(DbTableName.COIN.value, columns, rows)
+    return res
+
+
 def delete_coin(db: Db, siteid: str, website_id: int) -> int:
     """Delete an existing coin 
 
@@ -91,6 +150,18 @@ def delete_coin(db: Db, siteid: str, website_id: int) -> int:
     return res
 
 
+def delete_coins(db: Db, siteids: list[str], website_id: int) -> int:
+    """Delete existing coins in one transaction
+
+    return value = rowcount or total changes 
+    """
+    query = f'DELETE FROM {DbTableName.COIN.value} WHERE siteid=? AND website_id=?'
+    args = [(siteid, website_id) for siteid in siteids]
+    with db.transaction():
+        res = db.executemany(query, args)
+    return res
+
+
 def get_coin(db: Db, siteid: str, website_id: int) -> list:
     """Retrieves the coin from id 
     """
@@ -103,16 +174,13 @@ def get_coin(db: Db, siteid: str, website_id: int) -> list:
 def get_coins(db: Db, search: str, website_id: int) -> list:
     """Retrieves coins from search string
     """
-    query = f'''SELECT siteid, name, symbol, chain, base FROM {DbTableName.COIN.value} WHERE
-                website_id = {website_id} AND
-                (siteid like ? or
-                name like ? or
-                symbol like ? or
-                base like ?
-                )
-            '''
-    n = query.count('?')
-    args = (f'%{search}%',)*n
+    if search == '':
+        query = f'''SELECT siteid, name, symbol, chain, base FROM {DbTableName.COIN.value}
+                    WHERE website_id = ?
+                '''
+        args = (website_id,)
+    else:
+        query, args = db.get_query_search_coins(DbTableName.COIN.value, search, website_id)
     res = db.query(query, args)
     return res
 
@@ -121,3 +189,45 @@ def check_coin_table(db: Db) -> bool:
     """Check existance of coin table
     """
     return db.check_table(DbTableName.COIN.value)
+
+
+def insert_prices(db: Db, prices: list[CoinPriceData], website_id: int) -> int:
+    """Insert price data in bulk to the price table
+
+    return value = rowcount or total changes 
+    """
+    columns = ['website_id', 'coin', 'chain', 'curr', 'exchange',
+               'timestamp', 'price', 'volume', 'error']
+    rows = [(website_id,
+             price.coin.siteid,
+             price.coin.chain,
+             price.curr,
+             price.exchange,
+             int(price.date.timestamp()),
+             price.price,
+             price.volume,
+             price.error) for price in prices]
+    with db.transaction():
+        res = db.insert_many(DbTableName.PRICE.value, columns, rows)
+    return res
+
+
+def get_prices(db: Db, coin: str, curr: str, ts_from: int, ts_to: int, website_id: int) -> list:
+    """Retrieves prices of a coin in a currency between two timestamps
+
+    ts_from, ts_to = timestamps in seconds
+    """
+    query = f'''SELECT coin, chain, curr, exchange, timestamp, price, volume, error
+                FROM {DbTableName.PRICE.value} WHERE
+                coin = ? AND curr = ? AND timestamp BETWEEN ? AND ? AND website_id = ?
+                ORDER BY timestamp
+            '''
+    args = (coin, curr, ts_from, ts_to, website_id)
+    res = db.query(query, args)
+    return res
+
+
+def check_price_table(db: Db) -> bool:
+    """Check existance of price table
+    """
+    return db.check_table(DbTableName.PRICE.value)
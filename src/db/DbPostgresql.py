@@ -1,12 +1,13 @@
 """
 @author: Arno
 @created: 2022-11-03
-@modified: 2023-05-20
+@modified: 2026-10-17
 
 Database Helper Utilities Class
 
 """
 import psycopg2
+import psycopg2.extras
 
 from src.db.Db import Db
 
@@ -57,6 +58,21 @@ class DbPostgresql(Db):
         else:
             raise RuntimeError('Database connection already exists')
 
+    def insert_many(self, table: str, columns: list[str], rows: list[tuple]) -> int:
+        """Insert rows in bulk with one multi-row statement per page
+
+        table = name of the table
+        columns = names of the columns
+        rows = list of tuples with values in order of columns
+        return value = rowcount
+        """
+        sql = f'INSERT INTO {table} ({", ".join(columns)}) VALUES %s'
+        cursor = self.conn.cursor()  # type: ignore
+        psycopg2.extras.execute_values(cursor, sql, rows, page_size=1000)
+        result = self.get_execute_result(cursor)
+        cursor.close()
+        return result
+
     def get_query_check_table(self) -> str:
         """Get the query for check if table exists in database
         """
@@ -69,6 +85,25 @@ class DbPostgresql(Db):
         """
         return cursor.rowcount
 
+    def get_queries_create_coin_index(self, table: str) -> list[str]:
+        """Get the queries to create a unique index and trigram indexes for searching
+        """
+        return [
+            f'CREATE UNIQUE INDEX IF NOT EXISTS idx_{table}_website_siteid ON {table} (website_id, siteid)',
+            'CREATE EXTENSION IF NOT EXISTS pg_trgm',
+            f'''CREATE INDEX IF NOT EXISTS idx_{table}_trgm ON {table} USING gin (
+                siteid gin_trgm_ops, name gin_trgm_ops, symbol gin_trgm_ops, base gin_trgm_ops)
+            ''',
+        ]
+
+    def get_query_search_coins(self, table: str, search: str, website_id: int) -> tuple[str, tuple]:
+        """Get the query and arguments for searching coins with the trigram index
+
+        ILIKE for case insensitive search like SQLite
+        """
+        query, args = super().get_query_search_coins(table, search, website_id)
+        return query.replace(' like ', ' ilike '), args
+
     def get_create_primary_key_str(self) -> str:
         """Get the string to create a primary key for the specific databse type
         """
@@ -1,7 +1,7 @@
 """
 @author: Arno
 @created: 2022-11-03
-@modified: 2023-05-20
+@modified: 2026-10-17
 
 Database Helper Utilities Class
 
@@ -58,6 +58,57 @@ class DbSqlite3(Db):
         """
         return self.conn.total_changes
 
+    def get_queries_create_coin_index(self, table: str) -> list[str]:
+        """Get the queries to create a unique index and a full text search table
+
+        The FTS5 table uses the trigram tokenizer for case insensitive substring search,
+        and is kept up to date with triggers
+        """
+        queries = [f'CREATE UNIQUE INDEX IF NOT EXISTS idx_{table}_website_siteid ON {table} (website_id, siteid)']
+        if not self.check_table(f'{table}_fts'):
+            queries.extend([
+                f'''CREATE VIRTUAL TABLE {table}_fts USING fts5(
+                    name, symbol, siteid, base,
+                    content='{table}', content_rowid='id', tokenize='trigram')
+                ''',
+                f'''CREATE TRIGGER {table}_fts_insert AFTER INSERT ON {table} BEGIN
+                    INSERT INTO {table}_fts(rowid, name, symbol, siteid, base)
+                    VALUES (new.id, new.name, new.symbol, new.siteid, new.base);
+                    END
+                ''',
+                f'''CREATE TRIGGER {table}_fts_delete AFTER DELETE ON {table} BEGIN
+                    INSERT INTO {table}_fts({table}_fts, rowid, name, symbol, siteid, base)
+                    VALUES ('delete', old.id, old.name, old.symbol, old.siteid, old.base);
+                    END
+                ''',
+                f'''CREATE TRIGGER {table}_fts_update AFTER UPDATE ON {table} BEGIN
+                    INSERT INTO {table}_fts({table}_fts, rowid, name, symbol, siteid, base)
+                    VALUES ('delete', old.id, old.name, old.symbol, old.siteid, old.base);
+                    INSERT INTO {table}_fts(rowid, name, symbol, siteid, base)
+                    VALUES (new.id, new.name, new.symbol, new.siteid, new.base);
+                    END
+                ''',
+                f"INSERT INTO {table}_fts({table}_fts) VALUES('rebuild')",
+            ])
+        return queries
+
+    def get_query_search_coins(self, table: str, search: str, website_id: int) -> tuple[str, tuple]:
+        """Get the query and arguments for searching coins with the full text search table
+
+        The trigram tokenizer needs at least 3 characters,
+        shorter search strings are searched without index
+        """
+        if len(search) < 3 or not self.check_table(f'{table}_fts'):
+            return super().get_query_search_coins(table, search, website_id)
+
+        query = f'''SELECT siteid, name, symbol, chain, base FROM {table}
+                    WHERE website_id = ? AND
+                    id IN (SELECT rowid FROM {table}_fts WHERE {table}_fts MATCH ?)
+                '''
+        match_str = '"' + search.replace('"', '""') + '"'
+        args = (website_id, match_str)
+        return query, args
+
     def get_create_primary_key_str(self) -> str:
         """Get the string to create a primary key for the specific databse type
         """
@@ -0,0 +1,52 @@
+"""
+@author: Arno
+@created: 2026-10-17
+@modified: 2026-10-17
+
+Base Class PriceExporter
+
+"""
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+class PriceExporter(ABC):
+    """Base class for writing price data to a file, batch by batch
+
+    Batches are written when they arrive, so the whole result
+    doesn't have to be in memory
+    Use as context manager or call close when all batches are written
+    """
+
+    def __init__(self, filepath: Path) -> None:
+        self.filepath = filepath
+        self.nr_rows: int = 0
+
+    @abstractmethod
+    def write(self, df: "pd.DataFrame") -> None:
+        """Write a batch of price data
+
+        df = DataFrame with the same columns for every batch
+        """
+        pass
+
+    def read_column(self, column: str) -> set:
+        """Get the unique values of a column already in the file
+
+        Used to resume writing, returns empty set when there is no file
+        """
+        return set()
+
+    def close(self) -> None:
+        """Finish writing the file"""
+        pass
+
+    def __enter__(self) -> "PriceExporter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
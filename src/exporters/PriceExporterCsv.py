@@ -0,0 +1,42 @@
+"""
+@author: Arno
+@created: 2026-10-17
+@modified: 2026-10-17
+
+Price exporter to a csv file
+
+"""
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from src.exporters.PriceExporter import PriceExporter
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+class PriceExporterCsv(PriceExporter):
+    """Write price data to a csv file, every batch is appended to the file
+
+    append = keep an existing file and add the batches to it
+    """
+
+    def __init__(self, filepath: Path, append: bool = False) -> None:
+        super().__init__(filepath)
+        self.header = not (append and filepath.exists())
+        if not append:
+            filepath.unlink(missing_ok=True)
+
+    def write(self, df: "pd.DataFrame") -> None:
+        """Append a batch of price data to the csv file"""
+        df.to_csv(self.filepath, mode="a", header=self.header, index=False)
+        self.header = False
+        self.nr_rows += len(df)
+
+    def read_column(self, column: str) -> set:
+        """Get the unique values of a column already in the csv file"""
+        if not self.filepath.exists():
+            return set()
+        import pandas as pd
+
+        return set(pd.read_csv(self.filepath, usecols=[column])[column])
@@ -0,0 +1,92 @@
+"""
+@author: Arno
+@created: 2026-10-17
+@modified: 2026-10-17
+
+Price exporter to a parquet dataset
+
+"""
+from pathlib import Path
+from typing import TYPE_CHECKING, Optional
+
+from src.exporters.PriceExporter import PriceExporter
+
+if TYPE_CHECKING:
+    import pandas as pd
+    import pyarrow as pa
+
+
+class PriceExporterParquet(PriceExporter):
+    """Write price data to a parquet dataset, a folder with a file per batch
+
+    Every batch is added as a new compressed file, in a subfolder per value of
+    the partition columns, so a dataset can be appended without rewriting it
+    All batches get the column types of the first batch or the existing dataset
+
+    partition_cols = columns for subfolders, for example ['website']
+    append = keep an existing dataset and add the batches to it
+    """
+
+    def __init__(
+        self,
+        filepath: Path,
+        partition_cols: Optional[list[str]] = None,
+        append: bool = False,
+    ) -> None:
+        super().__init__(filepath)
+        self.partition_cols = partition_cols or []
+        self.schema: Optional["pa.Schema"] = None
+        if not append and filepath.exists():
+            import shutil
+
+            if filepath.is_dir():
+                shutil.rmtree(filepath)
+            else:
+                filepath.unlink()
+
+    def write(self, df: "pd.DataFrame") -> None:
+        """Add a batch of price data as new file to the dataset"""
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        table = pa.Table.from_pandas(df, preserve_index=False)
+
+        # categorical columns are stored as text, parquet encodes these itself
+        for nr, column_field in enumerate(table.schema):
+            if pa.types.is_dictionary(column_field.type):
+                table = table.set_column(
+                    nr, column_field.name, table.column(nr).cast(column_field.type.value_type)
+                )
+
+        if self.schema is None:
+            self.schema = self._read_schema() or table.schema
+        table = table.select(self.schema.names).cast(self.schema)
+
+        pq.write_to_dataset(
+            table,
+            root_path=self.filepath,
+            partition_cols=self.partition_cols,
+            compression="zstd",
+        )
+        self.nr_rows += len(df)
+
+    def _read_schema(self) -> Optional["pa.Schema"]:
+        """Get the schema of an existing dataset, without partition columns"""
+        if not self.filepath.exists():
+            return None
+        import pyarrow.dataset as ds
+
+        schema = ds.dataset(self.filepath, format="parquet", partitioning="hive").schema
+        for column in self.partition_cols:
+            if column in schema.names:
+                schema = schema.remove(schema.get_field_index(column))
+        return schema
+
+    def read_column(self, column: str) -> set:
+        """Get the unique values of a column already in the dataset"""
+        if not self.filepath.exists():
+            return set()
+        import pyarrow.dataset as ds
+
+        dataset = ds.dataset(self.filepath, format="parquet", partitioning="hive")
+        return set(dataset.to_table(columns=[column]).column(column).to_pylist())
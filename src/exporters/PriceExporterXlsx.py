@@ -0,0 +1,46 @@
+"""
+@author: Arno
+@created: 2026-10-17
+@modified: 2026-10-17
+
+Price exporter to an excel file
+
+"""
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import src.func.helperfunc as helperfunc
+from src.exporters.PriceExporter import PriceExporter
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+class PriceExporterXlsx(PriceExporter):
+    """Write price data to an excel file
+
+    An excel file cannot be appended, so batches are kept until close
+    Use csv or parquet for large exports
+    """
+
+    def __init__(self, filepath: Path) -> None:
+        super().__init__(filepath)
+        self.dfs: list["pd.DataFrame"] = []
+
+    def write(self, df: "pd.DataFrame") -> None:
+        """Keep a batch of price data for writing at close"""
+        self.dfs.append(df)
+        self.nr_rows += len(df)
+
+    def close(self) -> None:
+        """Write all batches to the excel file"""
+        if self.dfs == []:
+            return
+        import pandas as pd
+
+        df = pd.concat(self.dfs, ignore_index=True)
+        self.dfs = []
+        # remove timezone, because excel cannot handle this
+        if "date" in df.columns:
+            df["date"] = helperfunc.remove_tz(df["date"])
+        df.to_excel(self.filepath, index=False)
@@ -0,0 +1,3 @@
+"""
+__init__.py
+"""
@@ -1,19 +1,24 @@
 """
 @author: Arno
 @created: 2022-12-22
-@modified: 2023-05-20
+@modified: 2026-10-17
 
 Several helper functions
 
 """
 
+import math
 import os
-from datetime import datetime, timezone
+import re
+from datetime import datetime, timedelta, timezone
+from typing import TYPE_CHECKING, Optional
 
-import cfscrape
-import pandas as pd
 from dateutil import parser
 
+if TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
+
 
 def save_file(url: str, folder: str, filename: str):
     """Download and safe a file from internet
@@ -31,7 +36,9 @@ def save_file(url: str, folder: str, filename: str):
         ext = url.split(".")[-1]
         file = f"{folder}\\{filename}.{ext}"
 
-        # Download file
+        # Download file, cfscrape is imported here because it is slow to import
+        import cfscrape
+
         scraper = cfscrape.create_scraper()
         cfurl = scraper.get(url).content
 
@@ -55,11 +62,61 @@ def convert_timestamp(ts: int, ms: bool = False) -> datetime:
     return dt
 
 
-def remove_tz(serie: pd.Series) -> pd.Series:
+def get_columns(rows: list, nr_columns: int) -> "np.ndarray":
+    """Convert rows of numbers of a response to a 2d array, one column per field
+
+    Missing values (None) become nan
+
+    rows = list of lists, like [[ms, price], ...]
+    nr_columns = number of fields per row
+    """
+    import numpy as np
+
+    return np.asarray(rows, dtype=np.float64).reshape(-1, nr_columns)
+
+
+def convert_timestamps(values, ms: bool = False) -> "np.ndarray":
+    """Convert a column of timestamps to whole seconds at once
+
+    Counterpart of convert_timestamp for all values of a response
+
+    values = list or array of timestamps in sec, or in msec if ms = True
+    returns array of int64 seconds
+    """
+    import numpy as np
+
+    ts = np.asarray(values, dtype=np.float64)
+    if ms:
+        ts = ts / 1000
+    return ts.astype(np.int64)
+
+
+def convert_timestamps_to_dates(values, ms: bool = False) -> "pd.DatetimeIndex":
+    """Convert a column of timestamps to dates with timezone utc at once
+
+    No datetime object is made per value
+
+    values = list or array of timestamps in sec, or in msec if ms = True
+    """
+    import numpy as np
+    import pandas as pd
+
+    return pd.to_datetime(
+        np.asarray(values, dtype=np.int64), unit="ms" if ms else "s", utc=True
+    )
+
+
+def remove_tz(serie: "pd.Series") -> "pd.Series":
     """Remove timezone in panda column
 
     because excel cannot handle this timezone
+    A column with one timezone is converted at once,
+    a column of mixed datetime objects per value
     """
+    import pandas as pd
+
+    if isinstance(serie.dtype, pd.DatetimeTZDtype):
+        return serie.dt.tz_localize(None)
     return serie.apply(
         lambda d: (
             d
@@ -80,11 +137,22 @@ def get_current_time() -> int:
     return ts
 
 
-def convert_str_to_date(date: str) -> datetime:
+def get_midnight_utc() -> datetime:
+    """Get the start of the current day in UTC
+
+    Used as default for dates without time, so the same string is always the same date
+    """
+    return datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def convert_str_to_date(date: str, default_dt: Optional[datetime] = None) -> datetime:
     """Convert a date string to a datetime
     When no timezone in string presume it is UTC instead of local
+
+    default_dt = datetime with the parts missing in the string, default is now (UTC)
     """
-    default_dt = datetime.now(timezone.utc)
+    if default_dt is None:
+        default_dt = datetime.now(timezone.utc)
     try:
         dt = parser.parse(date, default=default_dt)
     except parser.ParserError as e:
@@ -97,3 +165,90 @@ def convert_str_to_date(date: str) -> datetime:
 def convert_date_to_utc_str(dt: datetime) -> str:
     """Convert datetime with timezone to a string in UTC"""
     return dt.astimezone(tz=timezone.utc).strftime("%d-%m-%Y_%H:%M")
+
+
+def convert_str_to_timedelta(step: str) -> timedelta:
+    """Convert a step string to a timedelta
+
+    step = hour(ly), day/daily or week(ly), or first character of these,
+           or a number with unit m (minutes), h, d or w, like 5m or 4h
+    """
+    match_nr = re.fullmatch(r"(\d+)\s*(m|min|h|d|w)", step.lower())
+    if match_nr is not None:
+        nr = int(match_nr.group(1))
+        unit = match_nr.group(2)
+        if nr > 0:
+            match unit:
+                case "m" | "min":
+                    return timedelta(minutes=nr)
+                case "h":
+                    return timedelta(hours=nr)
+                case "d":
+                    return timedelta(days=nr)
+                case "w":
+                    return timedelta(weeks=nr)
+
+    match step.lower():
+        case "h" | "hour" | "hourly":
+            return timedelta(hours=1)
+        case "d" | "day" | "daily":
+            return timedelta(days=1)
+        case "w" | "week" | "weekly":
+            return timedelta(weeks=1)
+        case _:
+            raise ValueError(f"Unknown step: {step}, use hour, day, week or like 5m, 4h")
+
+
+def get_date_range(start: str, end: str, step: str) -> list[str]:
+    """Get list of dates from start to end (included) with a step
+
+    Dates are returned as strings in ISO format with timezone,
+    so the same date has always the same string
+
+    start, end = date strings, without time the time is midnight (UTC)
+    step = hour(ly), day/daily or week(ly)
+    """
+    # fixed default time, so a rerun gives the same dates and can be resumed
+    midnight = get_midnight_utc()
+    dt = convert_str_to_date(start, midnight)
+    dt_end = convert_str_to_date(end, midnight)
+    delta = convert_str_to_timedelta(step)
+    dates = []
+    while dt <= dt_end:
+        dates.append(dt.isoformat(timespec="minutes"))
+        dt += delta
+    return dates
+
+
+def split_chunks(items: list[str], max_items: int, max_chars: int = 0) -> list[list[str]]:
+    """Split items in the least number of chunks of about the same size
+
+    Used to keep comma-separated url parameters within the limits of an api
+
+    items = list of strings, joined with a comma per chunk
+    max_items = maximum number of items per chunk, 0 is no limit
+    max_chars = maximum length of the joined items per chunk, 0 is no limit
+    """
+    if len(items) == 0:
+        return []
+    nr_chunks = 1
+    if max_items > 0:
+        nr_chunks = math.ceil(len(items) / max_items)
+    if max_chars > 0:
+        total_chars = sum(len(item) + 1 for item in items)
+        nr_chunks = max(nr_chunks, math.ceil(total_chars / max_chars))
+    chunk_size = math.ceil(len(items) / nr_chunks)
+
+    chunks: list[list[str]] = [[]]
+    chunk_chars = 0
+    for item in items:
+        chunk = chunks[-1]
+        full = len(chunk) >= chunk_size
+        if max_chars > 0 and chunk_chars + len(item) + 1 > max_chars:
+            full = True
+        if full and len(chunk) > 0:
+            chunks.append([])
+            chunk_chars = 0
+        chunks[-1].append(item)
+        chunk_chars += len(item) + 1
+    return chunks
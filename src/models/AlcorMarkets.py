@@ -0,0 +1,73 @@
+"""
+@author: Arno
+@created: 2026-10-17
+@modified: 2026-10-17
+
+Market lists of the Alcor chains, shared within one process
+
+The /markets payload of a chain has the current prices and all assets,
+so it is used by the price and the search model
+"""
+import threading
+import time
+
+import config
+from src.req.RequestHelper import RequestHelper
+
+# chain: (time retrieved, list of markets)
+_markets: dict[str, tuple[float, list]] = {}
+_lock = threading.Lock()
+
+
+def get_markets_url(chain: str) -> str:
+    """Get url of all markets of a chain"""
+    return f'{config.ALCOR_URL.replace("?", chain)}/markets'
+
+
+def get_markets_loaded(chains: list[str], max_age: float) -> dict[str, list]:
+    """Get the markets of chains already retrieved by this process
+
+    chains = list of chain names
+    max_age = maximum age in seconds of the markets, 0 is none
+    returns dictionary with chain as key and list of markets, only for chains found
+    """
+    if max_age <= 0:
+        return {}
+    now = time.time()
+    with _lock:
+        return {chain: _markets[chain][1] for chain in chains
+                if chain in _markets and now - _markets[chain][0] <= max_age}
+
+
+def get_markets(req: RequestHelper, chains: list[str], max_age: float) -> dict[str, list]:
+    """Get the markets of chains
+
+    Markets older than max_age are requested again, all chains at the same time
+
+    req = request helper for the requests
+    chains = list of chain names
+    max_age = maximum age in seconds of the markets, 0 is always request
+    returns dictionary with chain as key and list of markets, only for chains found
+    """
+    markets = get_markets_loaded(chains, max_age)
+    chains_todo = [chain for chain in chains if chain not in markets]
+    if len(chains_todo) > 0:
+        now = time.time()
+        resps = req.get_many([get_markets_url(chain) for chain in chains_todo])
+        for chain, resp in zip(chains_todo, resps):
+            if resp['status_code'] == 200 and 'result' in resp:
+                set_markets(chain, resp['result'], now)
+                markets[chain] = resp['result']
+            else:
+                print(f'Unable to get markets of chain {chain}')
+    return markets
+
+
+def set_markets(chain: str, markets: list, retrieved: float) -> None:
+    """Share the markets of a chain
+
+    retrieved = time the markets are retrieved from the website
+    """
+    with _lock:
+        if chain not in _markets or _markets[chain][0] < retrieved:
+            _markets[chain] = (retrieved, markets)
@@ -0,0 +1,62 @@
+"""
+@author: Arno
+@created: 2026-10-17
+@modified: 2026-10-17
+
+Class AssetIndex
+
+Index for fast prefix search in a list of assets
+"""
+import re
+from bisect import bisect_left
+from typing import Callable
+
+
+class AssetIndex:
+    """Prefix index over a list of assets, build once per loaded asset list
+
+    All search keys of all assets are lowercased and kept in one sorted list.
+    A prefix search is a binary search for the first key with the prefix,
+    followed by reading keys until the prefix doesn't match anymore.
+
+    constructor:
+        assets = list of assets
+        get_keys = function returning the search strings of an asset
+    """
+
+    def __init__(self, assets: list, get_keys: Callable[[object], list[str]]):
+        self.assets = assets
+        self.get_keys = get_keys
+        entries = sorted(
+            (str(key).lower(), i)
+            for i, asset in enumerate(assets)
+            for key in get_keys(asset)
+        )
+        self.keys: list[str] = [entry[0] for entry in entries]
+        self.positions: list[int] = [entry[1] for entry in entries]
+
+    def search(self, search_str: str) -> list:
+        """Search for assets with a key starting with the search string
+
+        returns assets in original order
+        """
+        prefix = search_str.lower()
+        if prefix == '':
+            return list(self.assets)
+
+        found = set()
+        i = bisect_left(self.keys, prefix)
+        while i < len(self.keys) and self.keys[i].startswith(prefix):
+            found.add(self.positions[i])
+            i += 1
+        return [self.assets[i] for i in sorted(found)]
+
+    def search_regex(self, search_str: str) -> list:
+        """Search for assets with a key matching the regular expression
+
+        The expression must match at the start of a key
+        returns assets in original order
+        """
+        pattern = re.compile(search_str.lower())
+        return [asset for asset in self.assets
+                if any(pattern.match(str(key).lower()) for key in self.get_keys(asset))]
@@ -1,16 +1,26 @@
 """
 @author: Arno
 @created: 2022-10-15
-@modified: 2023-05-20
+@modified: 2026-10-17
 
 Base Class CoinPrice
 
 """
 from abc import ABC, abstractmethod
-from typing import Callable
+from typing import TYPE_CHECKING, Callable, Hashable
 
+import config
+import src.func.helperfunc as helperfunc
 from src.data.CoinData import CoinData, CoinPriceData
+from src.data.PriceSeries import PriceSeries
 from src.req.RequestHelper import RequestHelper
+from src.req.ResponseCache import ResponseCache
+
+if TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
+
+    from src.data.PriceResampler import PriceResampler
 
 
 class CoinPrice(ABC):
@@ -20,11 +30,48 @@ class CoinPrice(ABC):
 
     def __init__(self) -> None:
         self.website_id: int = 0
-        self.req = RequestHelper()
+        self.req = RequestHelper(
+            cache=ResponseCache(
+                config.CACHE_PATH, config.RESPONSE_CACHE_TTL, config.MARKETS_CACHE_TTL
+            )
+        )
+        self.current_max_age: float = config.RESPONSE_CACHE_TTL  # sec, for shared markets
         self.nr_try_max: int = 10
+        self.series: dict[Hashable, PriceSeries] = {}
+        self.resamplers: dict[tuple, "PriceResampler"] = {}  # candles per series
+        self.volume_rolling: bool = False  # volume of a point is of the last 24h
+        self.series_margin: int = 4 * 3600  # time range around requested dates
+        self.series_max_range: int = 90 * 24 * 3600  # time range per request
         self.view_update_progress: Callable[[int, int], None]
         self.view_update_progress_text: Callable[[str], None]
 
+    @staticmethod
+    def get_coin_index(
+        coindata: list[CoinData], fn_key: Callable[[CoinData], Hashable] = lambda coin: coin.siteid
+    ) -> dict[Hashable, list[CoinData]]:
+        """Get index to find the coins of a response key in one lookup
+
+        A coin can be in coindata more than once, so every key has a list of coins
+
+        coindata = list of CoinData
+        fn_key = function to get the key of a coin, default the siteid
+        returns dictionary with key: list of CoinData
+        """
+        index: dict[Hashable, list[CoinData]] = {}
+        for coin in coindata:
+            index.setdefault(fn_key(coin), []).append(coin)
+        return index
+
+    def set_cache_current(self, use_cache: bool) -> None:
+        """Use cached current prices or always request them
+
+        Polling needs new prices every tick, so there the cache is not used
+
+        use_cache = False to always request current prices
+        """
+        self.req.set_cache_current(use_cache)
+        self.current_max_age = config.RESPONSE_CACHE_TTL if use_cache else 0
+
     @abstractmethod
     def get_price_current(self, coindata: list[CoinData], currencies: list[str]) -> list[CoinPriceData]:
         """Get current price
@@ -36,7 +83,6 @@ class CoinPrice(ABC):
         """
         pass
 
-    @abstractmethod
     def get_price_hist_marketchart(self, coindata: list[CoinData], currencies: list[str], date: str) -> list[CoinPriceData]:
         """Get history price of a coin or a token
 
@@ -48,8 +94,249 @@ class CoinPrice(ABC):
 
         returns list of CoinPriceData
         """
+        return self.get_price_hist_marketchart_dates(coindata, currencies, [date])[date]
+
+    @abstractmethod
+    def get_price_hist_marketchart_dates(self, coindata: list[CoinData], currencies: list[str],
+                                         dates: list[str]) -> dict[str, list[CoinPriceData]]:
+        """Get history price of a coin or a token on multiple dates
+
+        One time series per coin and currency is retrieved for all dates
+
+        coindata = list of CoinData or token contracts for market base
+        curr = list of strings with assets for market quote
+        dates = list of historical dates
+
+        returns dictionary with date as key and list of CoinPriceData
+        """
         pass
 
+    @abstractmethod
+    def get_ohlc_url(self, item, ts_from: int, ts_to: int, resolution: int) -> str:
+        """Get the url for the market chart of one item between two timestamps
+
+        item = object to retrieve price series for, CoinData or CoinMarketData
+        ts_from, ts_to = time range in sec
+        resolution = time between points in sec
+        """
+        pass
+
+    @abstractmethod
+    def parse_ohlc(self, resp: dict, resolution: int) -> "np.ndarray":
+        """Get the points of a market chart response
+
+        returns 2d array with columns timestamp (sec), open, high, low, close, volume
+        """
+        pass
+
+    def get_ohlc_max_range(self, resolution: int) -> int:
+        """Get the time range of one request for a resolution in sec
+
+        The number of points per request is the same as with hourly series
+        """
+        return self.series_max_range * resolution // 3600
+
+    def get_ohlc_resolution(self, resolution: int) -> int:
+        """Get the resolution to download for a requested resolution in sec
+
+        When different, the downloaded points are resampled to the requested resolution
+        """
+        return resolution
+
+    def get_series_items(self, coin: CoinData, currency: str) -> list[tuple[str, object]]:
+        """Get the items to retrieve the price series of a coin in a currency
+
+        returns list of (exchange, item for get_ohlc_url)
+        """
+        return [("", (coin, currency))]
+
+    def get_series_url(self, item, ts_from: int, ts_to: int) -> str:
+        """Get the url for the hourly market chart of one item between two timestamps"""
+        return self.get_ohlc_url(item, ts_from, ts_to, 3600)
+
+    def parse_series(self, resp: dict) -> tuple[list[int], list[float], list[float]]:
+        """Get timestamps (sec), prices (open) and volumes from an hourly market chart response
+        """
+        points = self.parse_ohlc(resp, 3600)
+        return points[:, 0].astype("int64").tolist(), points[:, 1].tolist(), points[:, 5].tolist()
+
+    def get_price_series(self, coin: CoinData, currency: str, start: str, end: str,
+                         resolution: str = "hour") -> "pd.DataFrame":
+        """Get all prices of a coin in a currency between two dates
+
+        The time range is split in requests aligned to fixed time windows,
+        so the same windows are requested again and served from the response cache
+
+        coin = CoinData of market base
+        currency = market quote
+        start, end = date strings, without time the time is midnight (UTC)
+        resolution = hour, day or week
+
+        returns DataFrame with columns date (utc), exchange, open, high, low, close, volume
+        """
+        import pandas as pd
+
+        columns = ["open", "high", "low", "close", "volume"]
+        frames = []
+        for exchange, points in self._get_series_points(coin, currency, start, end, resolution):
+            df = pd.DataFrame(points[:, 1:], columns=columns)
+            df.insert(0, "date", helperfunc.convert_timestamps_to_dates(points[:, 0]))
+            df.insert(1, "exchange", exchange)
+            frames.append(df)
+        if len(frames) == 0:
+            return pd.DataFrame(columns=["date", "exchange"] + columns)
+        return pd.concat(frames, ignore_index=True)
+
+    def get_price_candles(self, coin: CoinData, currency: str, start: str, end: str,
+                          resolutions: list[str], resolution_download: str = "hour"
+                          ) -> dict[str, "pd.DataFrame"]:
+        """Get candles of a coin in a currency at several resolutions with one download
+
+        The series is retrieved once at resolution_download and resampled locally,
+        resolutions smaller than resolution_download are not more precise
+        The candles are kept per series, so when called again for a later end only
+        the last candle and the new candles are calculated
+
+        resolutions = list like 5m, 1h, 4h, 1d, 1w
+        returns dictionary with resolution: DataFrame with columns
+                date (utc, start of candle), exchange, open, high, low, close, volume
+        """
+        import pandas as pd
+
+        from src.data.PriceResampler import PriceResampler
+
+        res = {resolution: int(helperfunc.convert_str_to_timedelta(resolution).total_seconds())
+               for resolution in resolutions}
+        ts_start, ts_end = self._get_ts_range(start, end)
+        candles: dict[str, list[pd.DataFrame]] = {resolution: [] for resolution in resolutions}
+        for exchange, points in self._get_series_points(coin, currency, start, end,
+                                                        resolution_download):
+            key = (coin.chain, coin.siteid, currency, exchange, resolution_download)
+            if key not in self.resamplers:
+                self.resamplers[key] = PriceResampler([], volume_sum=not self.volume_rolling)
+            resampler = self.resamplers[key]
+            resampler.set_resolutions(list(res.values()))
+            if len(resampler) > 0 and len(points) > 0 and points[0, 0] >= resampler.points[0, 0]:
+                # points before the last known point are already in the candles
+                points = points[points[:, 0] >= resampler.points[-1, 0]]
+            resampler.add(points)
+            for resolution, resolution_sec in res.items():
+                df = resampler.to_dataframe(resolution_sec, ts_start, ts_end)
+                df.insert(1, "exchange", exchange)
+                candles[resolution].append(df)
+
+        columns = ["date", "exchange", "open", "high", "low", "close", "volume"]
+        return {resolution: pd.concat(dfs, ignore_index=True) if dfs else pd.DataFrame(columns=columns)
+                for resolution, dfs in candles.items()}
+
+    @staticmethod
+    def _get_ts_range(start: str, end: str) -> tuple[int, int]:
+        """Get timestamps in sec of a start and end date string
+
+        Dates without time start at midnight (UTC), not at the current time of day
+        """
+        midnight = helperfunc.get_midnight_utc()
+        ts_start = int(helperfunc.convert_str_to_date(start, midnight).timestamp())
+        ts_end = int(helperfunc.convert_str_to_date(end, midnight).timestamp())
+        return ts_start, ts_end
+
+    def _get_series_points(self, coin: CoinData, currency: str, start: str, end: str,
+                           resolution: str) -> list[tuple[str, "np.ndarray"]]:
+        """Retrieve the points of all series of a coin in a currency between two dates
+
+        returns list of (exchange, points sorted on timestamp without duplicates)
+        """
+        import numpy as np
+
+        from src.data.PriceResampler import PriceResampler
+
+        res = int(helperfunc.convert_str_to_timedelta(resolution).total_seconds())
+        ts_start, ts_end = self._get_ts_range(start, end)
+        res_download = self.get_ohlc_resolution(res)
+        max_range = self.get_ohlc_max_range(res_download)
+
+        ranges = [(ts, ts + max_range)
+                  for ts in range(ts_start - ts_start % max_range, ts_end + 1, max_range)]
+        items = self.get_series_items(coin, currency)
+        urls = [self.get_ohlc_url(item, ts_from, ts_to, res_download)
+                for _, item in items for ts_from, ts_to in ranges]
+        resps = iter(self.req.get_many(urls, self.view_update_progress))
+
+        series = []
+        for exchange, _ in items:
+            points_ranges = [self.parse_ohlc(resp, res_download) for resp in
+                             (next(resps) for _ in ranges) if resp["status_code"] != "error"]
+            if len(points_ranges) == 0:
+                continue
+            points = np.concatenate(points_ranges)
+            points = points[(points[:, 0] >= ts_start) & (points[:, 0] <= ts_end)]
+            points = points[np.argsort(points[:, 0], kind="stable")]
+            # keep the last point of the same timestamp
+            points = points[np.append(np.diff(points[:, 0]) != 0, True)]
+            if res_download != res:
+                points = PriceResampler.resample(points, res, not self.volume_rolling)
+            series.append((exchange, points))
+        return series
+
+    def load_series(self, items: dict[Hashable, object], ts_list: list[int]) -> None:
+        """Load the price series of all items around all timestamps
+
+        A single time range is retrieved per item, split in requests of
+        at most series_max_range. Series already covering the range are not retrieved.
+        When no data is found, the range is increased until data is found.
+
+        items = dictionary with series key and item for get_series_url
+        ts_list = list of timestamps in sec
+        """
+        tsnow = helperfunc.get_current_time()
+        ts_from = min(ts_list) - self.series_margin
+        ts_to = min(max(ts_list) + self.series_margin, tsnow)
+
+        todo = {key: item for key, item in items.items()
+                if key not in self.series or not self.series[key].covers(ts_from, ts_to)}
+        for key in todo:
+            self.series.setdefault(key, PriceSeries()).error = ''
+
+        ranges = []
+        start = ts_from
+        while start < ts_to:
+            end = min(start + self.series_max_range, ts_to)
+            ranges.append((start, end))
+            start = end
+        if len(ranges) == 0:
+            ranges.append((ts_from, ts_to))
+
+        self._load_series_ranges([(key, item, start, end) for key, item in todo.items()
+                                  for start, end in ranges])
+
+        # increase time range for series without data
+        for nr_try in range(1, self.nr_try_max):
+            empty = {key: item for key, item in todo.items()
+                     if len(self.series[key]) == 0 and self.series[key].error == ''}
+            if len(empty) == 0:
+                break
+            ts_from_try = ts_from - 2 ** (2 * nr_try) * 3600
+            ts_to_try = min(ts_to + 2 ** (2 * nr_try) * 3600, tsnow)
+            self._load_series_ranges([(key, item, ts_from_try, ts_to_try)
+                                      for key, item in empty.items()])
+
+    def _load_series_ranges(self, ranges: list[tuple[Hashable, object, int, int]]) -> None:
+        """Request time ranges concurrently and add them to the series
+
+        ranges = list of (series key, item, ts_from, ts_to)
+        """
+        urls = [self.get_series_url(item, start, end) for _, item, start, end in ranges]
+        resps = self.req.get_many(urls, self.view_update_progress)
+
+        for (key, _, start, end), resp in zip(ranges, resps):
+            series = self.series[key]
+            if resp["status_code"] == "error":
+                # got no status from request, must be an error
+                series.error = str(resp.get("error", "error"))
+            else:
+                timestamps, prices, volumes = self.parse_series(resp)
+                series.add(timestamps, prices, volumes, start, end)
+
     def get_price_hist(self, coindata: list[CoinData], currencies: list[str], date: str) -> list[CoinPriceData]:
         """Get coingecko history price
 
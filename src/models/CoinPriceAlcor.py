@@ -1,23 +1,27 @@
 """
 @author: Arno
 @created: 2022-08-31
-@modified: 2023-05-20
+@modified: 2026-10-17
 
 Collecting prices
 
 Alcor
 """
 
-import copy
 import math
 from datetime import datetime
+from typing import TYPE_CHECKING
 
 import config
 import src.func.helperfunc as helperfunc
+import src.models.AlcorMarkets as AlcorMarkets
 from src.data.CoinData import CoinData, CoinMarketData, CoinPriceData
 from src.data.DbData import DbWebsiteName
 from src.models.CoinPrice import CoinPrice
 
+if TYPE_CHECKING:
+    import numpy as np
+
 
 class CoinPriceAlcor(CoinPrice):
     """Class for retrieving price data of a set of coins on the Alcor website"""
@@ -26,27 +30,25 @@ class CoinPriceAlcor(CoinPrice):
         self.website = DbWebsiteName.ALCOR.name.lower()
         self.markets: dict[str, CoinMarketData] = {}
         super().__init__()
+        self.req.set_rate_limit(config.ALCOR_RATE_LIMIT)
+        self.series_max_range = 30 * 24 * 3600
 
     def get_price_current(
         self, coindata: list[CoinData], currencies: list[str]
     ) -> list[CoinPriceData]:
         """Get alcor current price"""
-        # make dict per chain (key1) with a dict of coins per coinid (key2)
-        coin_srch: dict[str, dict[str, CoinData]] = {}
-        for coin in coindata:
-            coin_srch.setdefault(coin.chain, {}).update({coin.siteid: coin})
+        # make index of coins per chain and coinid
+        coin_index = self.get_coin_index(coindata, lambda coin: (coin.chain, coin.siteid))
+        chains = list(dict.fromkeys(coin.chain for coin in coindata))
+
+        # get all market data for each chain from Alcor site, all chains at once
+        markets = AlcorMarkets.get_markets(self.req, chains, self.current_max_age)
 
-        # get all market data for each chain from Alcor site
         prices: list[CoinPriceData] = []
-        for key_chain, val_coins in coin_srch.items():
-            url = f'{config.ALCOR_URL.replace("?", key_chain)}/markets'
-            resp = self.req.get_request_response(url)
-
-            # search through result for coin in the dict
-            for item in resp["result"]:
-                item_id = str(item["id"])
-                if item_id in val_coins:
-                    coin = val_coins[item_id]
+        for chain in chains:
+            # search through result for coins in the index
+            for item in markets.get(chain, []):
+                for coin in coin_index.get((chain, str(item["id"])), []):
                     coin.name = item["quote_token"]["str"]
                     coin.symbol = item["quote_token"]["symbol"]["name"]
                     coin_price_data = CoinPriceData(
@@ -65,107 +67,85 @@ class CoinPriceAlcor(CoinPrice):
 
         return prices
 
-    def get_price_hist_marketchart(
-        self, coindata: list[CoinData], currencies: list[str], date: str
-    ) -> list[CoinPriceData]:
-        """Get alcor history price of a coin via market chart data"""
-        # convert date to unix timestamp
-        dt = helperfunc.convert_str_to_date(date)
-        ts = int(dt.timestamp())
-
-        # make parameters
-        params = {}
-        params["resolution"] = 60
-        params["from"] = ts
-        params["to"] = ts
+    def get_price_hist_marketchart_dates(
+        self, coindata: list[CoinData], currencies: list[str], dates: list[str]
+    ) -> dict[str, list[CoinPriceData]]:
+        """Get alcor history price of coins via market chart data on multiple dates"""
+        # convert dates to unix timestamp
+        dts = {date: helperfunc.convert_str_to_date(date) for date in dates}
+        ts_list = [int(dt.timestamp()) for dt in dts.values()]
 
         # markets must be loaded
         if len(self.markets) == 0:
             self.get_price_current(coindata, currencies)
 
-        prices: list[CoinPriceData] = []
-        i = 0
-        for coin in coindata:
-            i += 1
-            self.view_update_progress(i, len(coindata))
-
-            coinprice = self.get_pricedata_hist_marketchart_retry(coin, dt, ts, params)
-            prices.append(coinprice)
+        # load one time series per coin
+        self.load_series({(coin.chain, coin.siteid): coin for coin in coindata}, ts_list)
+
+        prices: dict[str, list[CoinPriceData]] = {}
+        for date, dt in dts.items():
+            ts = int(dt.timestamp())
+            prices[date] = []
+            for coin in coindata:
+                series = self.series[(coin.chain, coin.siteid)]
+                coin_base = self.markets[coin.siteid].curr
+                point = series.nearest(ts)
+                if point is None:
+                    prices[date].append(
+                        CoinPriceData(
+                            date=dt,
+                            coin=coin,
+                            curr=coin_base,
+                            price=math.nan,
+                            volume=math.nan,
+                            error=series.error or "no data found",
+                        )
+                    )
+                else:
+                    prices[date].append(
+                        CoinPriceData(
+                            date=helperfunc.convert_timestamp(point[0]),
+                            coin=coin,
+                            curr=coin_base,
+                            price=point[1],
+                            volume=point[2],
+                        )
+                    )
 
         return prices
 
-    def get_pricedata_hist_marketchart_retry(
-        self, coin: CoinData, dt, ts, params
-    ) -> CoinPriceData:
-        """Get history price data for one coin from and to specific date
+    def get_series_items(
+        self, coin: CoinData, currency: str
+    ) -> list[tuple[str, object]]:
+        """Get the market of a coin, the currency is always the base of the market"""
+        return [("", coin)]
 
-        with retry mechanism for bigger time range when no data is found
-        increase time range until data is found
-        """
-        params_try = copy.deepcopy(params)
-        url = (
-            f'{config.ALCOR_URL.replace("?", coin.chain)}/markets/{coin.siteid}/charts'
-        )
+    def get_ohlc_url(self, item: CoinData, ts_from: int, ts_to: int, resolution: int) -> str:
+        """Get url of the chart of a coin
 
-        date = dt
-        tsnow = helperfunc.get_current_time()
-        coin_base = self.markets[coin.siteid].curr
-        price = math.nan
-        volume = math.nan
-        error = "no data found"
-
-        for nr_try in range(1, self.nr_try_max):
-            # retry same coin with new date range
-            params_try["from"] -= 2 ** (2 * nr_try) * 3600
-            params_try["to"] += 2 ** (2 * nr_try) * 3600
-            params_try["to"] = min(params_try["to"], tsnow)
-
-            url_try = self.req.api_url_params(url, params_try)
-            resp = self.req.get_request_response(url_try)
-
-            # check for correct response
-            if resp["status_code"] == "error":
-                # got no status from request, must be an error
-                error = resp["error"]
-                break
-            else:
-                resp_prices = resp["result"]
-                if len(resp_prices) > 0:
-                    # select result with timestamp nearest to desired date ts
-                    resp_price_minimal = self.search_price_minimal_timediff(
-                        resp_prices, ts, True
-                    )
-
-                    # set found coin price data
-                    date = helperfunc.convert_timestamp(
-                        resp_price_minimal["time"], True
-                    )
-                    price = resp_price_minimal["open"]
-                    volume = resp_price_minimal["volume"]
-                    error = ""
-                    break
-
-        return CoinPriceData(
-            date=date,
-            coin=coin,
-            curr=coin_base,
-            price=price,
-            volume=volume,
-            error=error,
-        )
+        resolution = in sec, the api uses minutes or 1D / 1W
+        """
+        if resolution >= 7 * 24 * 3600:
+            resolution_str = "1W"
+        elif resolution >= 24 * 3600:
+            resolution_str = "1D"
+        else:
+            resolution_str = str(resolution // 60)
+        url = f'{config.ALCOR_URL.replace("?", item.chain)}/markets/{item.siteid}/charts'
+        params = {}
+        params["resolution"] = resolution_str
+        params["from"] = ts_from
+        params["to"] = ts_to
+        return self.req.api_url_params(url, params)
 
-    def search_price_minimal_timediff(self, prices, ts: int, ms: bool = False):
-        """Search for record in price data with the smallest time difference
+    def parse_ohlc(self, resp: dict, resolution: int) -> "np.ndarray":
+        """Get points from chart response
 
-        ts = timestamp in sec if ms = False
-        ts = timestamp in msec if ms = True
+        resp['result'] = [{'time': ms, 'open':, 'high':, 'low':, 'close':, 'volume':}, ...]
         """
-        timediff_minimal = 10**20
-        price_minimal = {}
-        ts = ts * 1000 if ms == True else ts
-        for price in prices:
-            timediff = abs(ts - price["time"])
-            if timediff < timediff_minimal:
-                timediff_minimal = timediff
-                price_minimal = price
-        return price_minimal
+        fields = ["time", "open", "high", "low", "close", "volume"]
+        candles = helperfunc.get_columns(
+            [[c.get(field) for field in fields] for c in resp.get("result", [])], 6
+        )
+        candles[:, 0] = helperfunc.convert_timestamps(candles[:, 0], ms=True)
+        return candles
@@ -1,15 +1,15 @@
 """
 @author: Arno
 @created: 2022-03-23
-@modified: 2025-08-05
+@modified: 2026-10-17
 
 Collecting prices
 
 Coingecko
 """
 
-import copy
 import math
+from typing import TYPE_CHECKING
 
 import config
 import src.func.helperfunc as helperfunc
@@ -17,6 +17,9 @@ from src.data.CoinData import CoinData, CoinPriceData
 from src.data.DbData import DbWebsiteName
 from src.models.CoinPrice import CoinPrice
 
+if TYPE_CHECKING:
+    import numpy as np
+
 
 class CoinPriceCoingecko(CoinPrice):
     """Class for retrieving price data of a set of coins on the coingecko website"""
@@ -24,104 +27,109 @@ class CoinPriceCoingecko(CoinPrice):
     def __init__(self) -> None:
         self.website = DbWebsiteName.COINGECKO.name.lower()
         super().__init__()
+        self.req.set_rate_limit(config.COINGECKO_RATE_LIMIT)
+        # total_volumes of the market chart is the volume of the last 24h
+        self.volume_rolling = True
 
     def get_price_current(
         self, coindata: list[CoinData], currencies: list[str]
     ) -> list[CoinPriceData]:
-        """Get coingecko current price"""
-        # convert list to comma-separated string
-        coins = ",".join(coin.siteid for coin in coindata)
-        curr = ",".join(currencies)
+        """Get coingecko current price
 
+        The ids are split over more requests when there are too many for one url
+        """
         # make parameters for api call
         params = {}
-        params["ids"] = coins
-        params["vs_currencies"] = curr
+        params["vs_currencies"] = ",".join(currencies)
         params["include_last_updated_at"] = True
 
         api_demo = config.COINGECKO_API_DEMO
         if api_demo != "":
             params["x_cg_demo_api_key"] = api_demo
 
-        url = f"{config.COINGECKO_URL}/simple/price"
-        url = self.req.api_url_params(url, params)
-        resp = self.req.get_request_response(url)
-
-        # create list of CoinPriceData from respone
-        prices: list[CoinPriceData] = []
-        for resp_key, resp_val in resp.items():
-            for coin in coindata:
-                if resp_key == coin.siteid:
-                    date = helperfunc.convert_timestamp(resp_val["last_updated_at"])
-                    for currency in currencies:
-                        if currency in resp_val:
-                            prices.append(
-                                CoinPriceData(
-                                    date=date,
-                                    coin=coin,
-                                    curr=currency,
-                                    price=resp_val[currency],
-                                )
-                            )
+        coins = list(dict.fromkeys(coin.siteid for coin in coindata))
+        chunks = helperfunc.split_chunks(
+            coins, config.COINGECKO_MAX_IDS, config.COINGECKO_MAX_URL_PARAM
+        )
+        urls = []
+        for chunk in chunks:
+            params["ids"] = ",".join(chunk)
+            url = f"{config.COINGECKO_URL}/simple/price"
+            urls.append(self.req.api_url_params(url, params))
+        resps = self.req.get_many(urls)
 
-        return prices
+        return self.convert_simple_price(coindata, currencies, resps)
 
     def get_price_current_token(
         self, coindata: list[CoinData], currencies: list[str]
     ) -> list[CoinPriceData]:
         """Get coingecko current price of a token
 
+        One request per chain, the contracts are split over more requests
+        when there are too many for one url
+
         coindata.chain = chain where contracts are
         coindata.siteid = contract address
         """
-        # convert list to comma-separated string
-        curr = ",".join(currencies)
-        chains = [coin.chain for coin in coindata]
-
         # prepare parameters for api call
         params = {}
-        params["vs_currencies"] = curr
+        params["vs_currencies"] = ",".join(currencies)
         params["include_last_updated_at"] = True
 
         api_demo = config.COINGECKO_API_DEMO
         if api_demo != "":
             params["x_cg_demo_api_key"] = api_demo
 
-        # create empty list of CoinPriceData from respone
-        prices: list[CoinPriceData] = []
-
-        # make api call per chain
-        for chain in chains:
-            # convert list to comma-separated string
-            contracts = ",".join(
-                coin.siteid for coin in coindata if coin.chain == chain
+        # unique contracts per chain
+        contracts_chain: dict[str, dict[str, None]] = {}
+        for coin in coindata:
+            contracts_chain.setdefault(coin.chain, {})[coin.siteid] = None
+
+        urls = []
+        for chain, contracts in contracts_chain.items():
+            chunks = helperfunc.split_chunks(
+                list(contracts),
+                config.COINGECKO_MAX_CONTRACTS,
+                config.COINGECKO_MAX_URL_PARAM,
             )
+            for chunk in chunks:
+                params["contract_addresses"] = ",".join(chunk)
+                url = f"{config.COINGECKO_URL}/simple/token_price/{chain}"
+                urls.append(self.req.api_url_params(url, params))
+        resps = self.req.get_many(urls)
 
-            # prepare parameters for api call
-            params["contract_addresses"] = contracts
+        return self.convert_simple_price(coindata, currencies, resps)
 
-            url = f"{config.COINGECKO_URL}/simple/token_price/{chain}"
-            url = self.req.api_url_params(url, params)
-            resp = self.req.get_request_response(url)
+    def convert_simple_price(
+        self, coindata: list[CoinData], currencies: list[str], resps: list[dict]
+    ) -> list[CoinPriceData]:
+        """Convert responses of simple price or token price to CoinPriceData
 
-            # remove status_code from dictionary
-            resp.pop("status_code")
+        coindata = coins requested, a coin can be in the list more than once
+        resps = responses with siteid or contract as key,
+                {siteid: {currency: price, 'last_updated_at': ts}}
+        """
+        coin_index = self.get_coin_index(coindata)
 
-            # extend list of CoinPriceData from respone
+        # create list of CoinPriceData from respone
+        prices: list[CoinPriceData] = []
+        for resp in resps:
             for resp_key, resp_val in resp.items():
-                for coin in coindata:
-                    if resp_key == coin.siteid:
-                        date = helperfunc.convert_timestamp(resp_val["last_updated_at"])
-                        for currency in currencies:
-                            if currency in resp_val:
-                                prices.append(
-                                    CoinPriceData(
-                                        date=date,
-                                        coin=coin,
-                                        curr=currency,
-                                        price=resp_val[currency],
-                                    )
+                coins = coin_index.get(resp_key)
+                if coins is None or not isinstance(resp_val, dict):
+                    continue
+                date = helperfunc.convert_timestamp(resp_val["last_updated_at"])
+                for currency in currencies:
+                    if currency in resp_val:
+                        for coin in coins:
+                            prices.append(
+                                CoinPriceData(
+                                    date=date,
+                                    coin=coin,
+                                    curr=currency,
+                                    price=resp_val[currency],
                                 )
+                            )
 
         return prices
 
@@ -142,16 +150,17 @@ class CoinPriceCoingecko(CoinPrice):
         if api_demo != "":
             params["x_cg_demo_api_key"] = api_demo
 
-        prices: list[CoinPriceData] = []
-        i = 0
-        for coin in coindata:
-            i += 1
-            self.view_update_progress(i, len(coindata))
-            # url = f"{config.COINGECKO_URL}/coins/{coin.siteid}/history?date={date}&localization=false"
-            url = f"{config.COINGECKO_URL}/coins/{coin.siteid}/history"
-            url = self.req.api_url_params(url, params)
-            resp = self.req.get_request_response(url)
+        # request history of all coins concurrently
+        urls = [
+            self.req.api_url_params(
+                f"{config.COINGECKO_URL}/coins/{coin.siteid}/history", params
+            )
+            for coin in coindata
+        ]
+        resps = self.req.get_many(urls, self.view_update_progress)
 
+        prices: list[CoinPriceData] = []
+        for coin, resp in zip(coindata, resps):
             if resp["status_code"] == "error":
                 # got no status from request, must be an error
                 for currency in currencies:
@@ -193,112 +202,116 @@ class CoinPriceCoingecko(CoinPrice):
 
         return prices
 
-    def get_price_hist_marketchart(
-        self, coindata: list[CoinData], currencies: list[str], date: str
-    ) -> list[CoinPriceData]:
-        """Get coingecko history price of a coin or a token
+    def get_price_hist_marketchart_dates(
+        self, coindata: list[CoinData], currencies: list[str], dates: list[str]
+    ) -> dict[str, list[CoinPriceData]]:
+        """Get coingecko history price of a coin or a token on multiple dates
 
         If chain = 'none' or None search for a coins otherwise search for token contracts
         """
-        # convert date to unix timestamp
-        dt = helperfunc.convert_str_to_date(date)
-        ts = int(dt.timestamp())
+        # convert dates to unix timestamp
+        dts = {date: helperfunc.convert_str_to_date(date) for date in dates}
+        ts_list = [int(dt.timestamp()) for dt in dts.values()]
+
+        # load one time series per coin and currency
+        items = {
+            (coin.siteid, coin.chain, currency): (coin, currency)
+            for coin in coindata
+            for currency in currencies
+        }
+        self.load_series(items, ts_list)
+
+        prices: dict[str, list[CoinPriceData]] = {}
+        for date, dt in dts.items():
+            ts = int(dt.timestamp())
+            prices[date] = []
+            for coin in coindata:
+                for currency in currencies:
+                    series = self.series[(coin.siteid, coin.chain, currency)]
+                    point = series.nearest(ts)
+                    if point is None:
+                        prices[date].append(
+                            CoinPriceData(
+                                date=dt,
+                                coin=coin,
+                                curr=currency,
+                                price=math.nan,
+                                volume=math.nan,
+                                error=series.error or "no data found",
+                            )
+                        )
+                    else:
+                        prices[date].append(
+                            CoinPriceData(
+                                date=helperfunc.convert_timestamp(point[0]),
+                                coin=coin,
+                                curr=currency,
+                                price=point[1],
+                                volume=point[2],
+                            )
+                        )
 
-        # make parameters
-        params = {}
-        params["from"] = ts
-        params["to"] = ts
+        return prices
 
-        api_demo = config.COINGECKO_API_DEMO
-        if api_demo != "":
-            params["x_cg_demo_api_key"] = api_demo
+    def get_ohlc_resolution(self, resolution: int) -> int:
+        """Get the resolution to download, Coingecko has only hourly and daily points
 
-        prices: list[CoinPriceData] = []
-        i = 0
-        for coin in coindata:
-            i += 1
-            self.view_update_progress(i, len(coindata))
-
-            for currency in currencies:
-                params["vs_currency"] = currency
+        Larger resolutions, like a week, are resampled from the daily points
+        """
+        if resolution < 3600:
+            raise ValueError("Coingecko has no price series with a resolution below an hour")
+        if resolution < 24 * 3600:
+            return 3600
+        return 24 * 3600
 
-                coinprice = self.get_pricedata_hist_marketchart_retry(
-                    coin, dt, ts, params, currency
-                )
-                prices.append(coinprice)
+    def get_ohlc_max_range(self, resolution: int) -> int:
+        """Get the time range of one request for a resolution in sec
 
-        return prices
+        Coingecko gives hourly points for a range up to 90 days, daily points above
+        """
+        if resolution < 24 * 3600:
+            return self.series_max_range
+        return 4 * self.series_max_range
 
-    def get_pricedata_hist_marketchart_retry(
-        self, coin: CoinData, dt, ts, params, currency
-    ) -> CoinPriceData:
-        """Get history price data for one coin from and to specific date
+    def get_ohlc_url(
+        self, item: tuple[CoinData, str], ts_from: int, ts_to: int, resolution: int
+    ) -> str:
+        """Get url of the market chart of a coin or token in one currency
 
-        with retry mechanism for bigger time range when no data is found
-        increase time range until data is found
+        The resolution follows from the time range, see get_ohlc_max_range
         """
-        params_try = copy.deepcopy(params)
-
+        coin, currency = item
         if coin.chain == "" or coin.chain == "none" or coin.chain is None:
             url = f"{config.COINGECKO_URL}/coins/{coin.siteid}/market_chart/range"
         else:
             url = f"{config.COINGECKO_URL}/coins/{coin.chain}/contract/{coin.siteid}/market_chart/range"
 
-        date = dt
-        tsnow = helperfunc.get_current_time()
-        price = math.nan
-        volume = math.nan
-        error = "no data found"
-
-        for nr_try in range(1, self.nr_try_max):
-            # retry same coin with new date range
-            params_try["from"] -= 2 ** (2 * nr_try) * 3600
-            params_try["to"] += 2 ** (2 * nr_try) * 3600
-            params_try["to"] = min(params_try["to"], tsnow)
-
-            url_try = self.req.api_url_params(url, params_try)
-            resp = self.req.get_request_response(url_try)
+        params = {}
+        params["vs_currency"] = currency
+        params["from"] = ts_from
+        params["to"] = ts_to
 
-            # check for correct response
-            if resp["status_code"] == "error":
-                # got no status from request, must be an error
-                error = resp["error"]
-                break
-            else:
-                resp_prices = resp["prices"]
-                if len(resp_prices) > 0:
-                    # select result with timestamp nearest to desired date ts
-                    resp_price_index = self.search_price_minimal_timediff(
-                        resp_prices, ts, True
-                    )
+        api_demo = config.COINGECKO_API_DEMO
+        if api_demo != "":
+            params["x_cg_demo_api_key"] = api_demo
 
-                    # set found coin price data
-                    date = helperfunc.convert_timestamp(
-                        resp_prices[resp_price_index][0], True
-                    )
-                    price = resp_prices[resp_price_index][1]
-                    volume = resp["total_volumes"][resp_price_index][1]
-                    error = ""
-                    break
+        return self.req.api_url_params(url, params)
 
-        return CoinPriceData(
-            date=date, coin=coin, curr=currency, price=price, volume=volume, error=error
-        )
+    def parse_ohlc(self, resp: dict, resolution: int) -> "np.ndarray":
+        """Get points from market chart response
 
-    def search_price_minimal_timediff(self, prices, ts: int, ms: bool = False) -> int:
-        """Search for record in price data with the smallest time difference
+        The market chart has only one price per point, this is open, high, low and close
+        The volume is the total of the 24h before the point, not of the interval
 
-        ts = timestamp in sec if ms = False
-        ts = timestamp in msec if ms = True
+        resp = {'prices': [[ms, price], ...], 'total_volumes': [[ms, volume], ...]}
         """
-        timediff_minimal = 10**20
-        price_index = 0
-        index = 0
-        ts = ts * 1000 if ms == True else ts
-        for price in prices:
-            timediff = abs(ts - price[0])
-            if timediff < timediff_minimal:
-                timediff_minimal = timediff
-                price_index = index
-            index += 1
-        return price_index
+        import numpy as np
+
+        resp_prices = helperfunc.get_columns(resp.get("prices", []), 2)
+        resp_volumes = helperfunc.get_columns(resp.get("total_volumes", []), 2)
+        timestamps = helperfunc.convert_timestamps(resp_prices[:, 0], ms=True)
+        prices = resp_prices[:, 1]
+        volumes = resp_volumes[:, 1]
+        if len(volumes) != len(prices):
+            volumes = np.full(len(prices), math.nan)
+        return np.column_stack([timestamps, prices, prices, prices, prices, volumes])
@@ -1,17 +1,19 @@
 """
 @author: Arno
 @created: 2022-03-23
-@modified: 2023-05-20
+@modified: 2026-10-17
 
 Collecting prices
 
 From Cryptowatch
 """
 
-import copy
+import dataclasses
+import heapq
 import math
 import re
 from datetime import datetime, timedelta
+from typing import TYPE_CHECKING
 
 import config
 import src.func.helperfunc as helperfunc
@@ -20,196 +22,250 @@ from src.data.CoinData import CoinData, CoinMarketData, CoinPriceData
 from src.data.DbData import DbWebsiteName
 from src.models.CoinPrice import CoinPrice
 
+if TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
+
 
 class CoinPriceCryptowatch(CoinPrice):
     """Class for retrieving price data of a set of coins on the cryptowatch website"""
 
-    def __init__(self, strictness: int = 0, max_markets_per_pair: int = 0) -> None:
+    def __init__(
+        self,
+        strictness: int = 0,
+        max_markets_per_pair: int = 0,
+        bulk: bool = True,
+        aggregate: bool = False,
+    ) -> None:
         self.website = DbWebsiteName.CRYPTOWATCH.name.lower()
         self.markets: list[CoinMarketData] = []
-        self.id_coindata: int = 0
+        self.markets_cache: dict[tuple, list[CoinMarketData]] = {}
         self.strictness: int = strictness
         self.max_markets_per_pair: int = max_markets_per_pair
+        self.bulk: bool = bulk
+        self.aggregate: bool = aggregate
         super().__init__()
+        self.series_max_range = 5000 * 3600  # api returns at most 6000 candles
 
         # Update header of request session with user API key
         self.req.update_header({"X-CW-API-Key": config.CRYPTOWATCH_API})
+        self.req.set_rate_limit(config.CRYPTOWATCH_RATE_LIMIT)
 
     def get_price_current(
         self, coindata: list[CoinData], currencies: list[str]
     ) -> list[CoinPriceData]:
         """Get Cryptowatch current price"""
-        # check if markets are already loaded for all coindata
-        if self.id_coindata != id(coindata):
-            print("----------------loading market data--------------")
-            self.markets = self.get_markets(coindata, currencies, self.strictness)
-            self.id_coindata = id(coindata)
+        # markets are only retrieved for coins not in the market cache
+        self.markets = self.get_markets(coindata, currencies, self.strictness)
 
+        markets = [market for market in self.markets if market.error == ""]
         prices: list[CoinPriceData] = []
-        i = 0
-        for market in self.markets:
-            i += 1
-            self.view_update_progress(i, len(self.markets))
-
-            if market.error == "":
-                url_list = f"{market.route}/summary"
-                resp = self.req.get_request_response(url_list)
-
-                # check for correct result
-                if resp["status_code"] == "error":
-                    # got no status from request, must be an error
+
+        # join prices of all markets from the bulk endpoints
+        if self.bulk and len(markets) > 0:
+            summaries, last_prices = self.get_markets_bulk()
+            markets_missing: list[CoinMarketData] = []
+            for market in markets:
+                key = f"{market.exchange}:{market.pair}".lower()
+                if key in summaries:
                     prices.append(
                         CoinPriceData(
                             date=datetime.now(),
                             coin=market.coin,
                             curr=market.curr,
                             exchange=market.exchange,
-                            price=math.nan,
-                            volume=math.nan,
+                            price=summaries[key]["price"]["last"],
+                            volume=summaries[key]["volume"],
                             active=market.active,
-                            error=resp["error"],
                         )
                     )
-                else:
+                elif key in last_prices:
                     prices.append(
                         CoinPriceData(
                             date=datetime.now(),
                             coin=market.coin,
                             curr=market.curr,
                             exchange=market.exchange,
-                            price=resp["result"]["price"]["last"],
-                            volume=resp["result"]["volume"],
+                            price=last_prices[key],
+                            volume=math.nan,
                             active=market.active,
                         )
                     )
+                else:
+                    markets_missing.append(market)
+            markets = markets_missing
+
+        # request summary of remaining markets concurrently
+        urls = [f"{market.route}/summary" for market in markets]
+        resps = self.req.get_many(urls, self.view_update_progress)
+
+        for market, resp in zip(markets, resps):
+            # check for correct result
+            if resp["status_code"] == "error":
+                # got no status from request, must be an error
+                prices.append(
+                    CoinPriceData(
+                        date=datetime.now(),
+                        coin=market.coin,
+                        curr=market.curr,
+                        exchange=market.exchange,
+                        price=math.nan,
+                        volume=math.nan,
+                        active=market.active,
+                        error=resp["error"],
+                    )
+                )
+            else:
+                prices.append(
+                    CoinPriceData(
+                        date=datetime.now(),
+                        coin=market.coin,
+                        curr=market.curr,
+                        exchange=market.exchange,
+                        price=resp["result"]["price"]["last"],
+                        volume=resp["result"]["volume"],
+                        active=market.active,
+                    )
+                )
 
-                self.view_update_progress(i, len(self.markets))
-                if "allowance" in resp:
-                    allowance = resp["allowance"]
-                    self.view_update_progress_text(allowance)
+        # show last known allowance
+        if len(resps) > 0 and "allowance" in resps[-1]:
+            self.view_update_progress_text(resps[-1]["allowance"])
 
         prices = self.filter_marketpair_on_volume(prices, self.max_markets_per_pair)
+        if self.aggregate:
+            prices = self.aggregate_marketpair(prices)
         return prices
 
-    def get_price_hist_marketchart(
-        self, coindata: list[CoinData], currencies: list[str], date: str
-    ) -> list[CoinPriceData]:
-        """Get coingecko history price of a coin or a token"""
-        # check if markets are already loaded for all coindata
-        if self.id_coindata != id(coindata):
-            print("----------------loading market data--------------")
-            self.markets = self.get_markets(coindata, currencies, self.strictness)
-            self.id_coindata = id(coindata)
-
-        # convert date to unix timestamp
-        dt = helperfunc.convert_str_to_date(date)
-        # api returns wrong date of 1 hour difference
-        dt = dt + timedelta(hours=1)
-        ts = int(dt.timestamp())
+    def get_markets_bulk(self) -> tuple[dict[str, dict], dict[str, float]]:
+        """Get summaries and last prices of all markets
 
-        # make parameters
-        params = {}
-        params["after"] = ts
-        params["before"] = ts
-        params["periods"] = 3600
+        Both endpoints are requested at the same time, following pages are
+        requested until there is no cursor with more data
 
-        prices: list[CoinPriceData] = []
-        i = 0
-        for market in self.markets:
-            i += 1
-            self.view_update_progress(i, len(self.markets))
-
-            if market.error == "":
-                coinprice = self.get_pricedata_hist_marketchart_retry(
-                    market, dt, ts, params
-                )
-                prices.append(coinprice)
+        returns two dictionaries with key 'exchange:pair',
+            summaries: {'price': {'last':, 'high':, 'low':, 'change':}, 'volume':, 'volumeQuote':}
+            last prices: float
+        """
+        urls = [
+            f"{config.CRYPTOWATCH_URL}/markets/summaries",
+            f"{config.CRYPTOWATCH_URL}/markets/prices",
+        ]
+        resps = self.req.get_many(urls)
+
+        results: list[dict] = []
+        for url, resp in zip(urls, resps):
+            result: dict = {}
+            while resp["status_code"] == 200:
+                resp_result = resp.get("result", {})
+                # newer api versions have the markets one level deeper
+                if "markets" in resp_result and isinstance(resp_result["markets"], dict):
+                    resp_result = resp_result["markets"]
+                result.update(resp_result)
+
+                cursor = resp.get("cursor", {})
+                if not cursor.get("hasMore", False):
+                    break
+                url_next = self.req.api_url_params(url, {"cursor": cursor["last"]})
+                resp = self.req.get_request_response(url_next)
 
-        prices = self.filter_marketpair_on_volume(prices, self.max_markets_per_pair)
-        return prices
+            if "allowance" in resp:
+                self.view_update_progress_text(resp["allowance"])
 
-    def get_pricedata_hist_marketchart_retry(
-        self, market: CoinMarketData, dt, ts, params
-    ) -> CoinPriceData:
-        """Get history price data for one coin from and to specific date
+            # key of price is 'market:exchange:pair', of summary 'exchange:pair'
+            results.append(
+                {key.lower().removeprefix("market:"): val for key, val in result.items()}
+            )
 
-        with retry mechanism for bigger time range when no data is found
-        increase time range until data is found
-        """
-        params_try = copy.deepcopy(params)
-        url = f"{market.route}/ohlc"
-
-        date = dt
-        tsnow = helperfunc.get_current_time()
-        coin = market.coin
-        curr = market.curr
-        exchange = market.exchange
-        price = math.nan
-        volume = math.nan
-        active = market.active
-        error = "no data found"
-
-        for nr_try in range(1, self.nr_try_max):
-            # retry same coin with new date range
-            params_try["after"] -= 2 ** (2 * nr_try) * 3600
-            params_try["before"] += 2 ** (2 * nr_try) * 3600
-            params_try["before"] = min(params_try["before"], tsnow)
-
-            url_try = self.req.api_url_params(url, params_try)
-            resp = self.req.get_request_response(url_try)
-
-            # check for correct response
-            if resp["status_code"] == "error":
-                # got no status from request, must be an error
-                error = resp["error"]
-                break
-            else:
-                resp_prices = resp["result"]["3600"]
-                if len(resp_prices) > 0:
-                    # select result with timestamp nearest to desired date ts
-                    resp_price_minimal = self.search_price_minimal_timediff(
-                        resp_prices, ts, False
+        return results[0], results[1]
+
+    def get_price_hist_marketchart_dates(
+        self, coindata: list[CoinData], currencies: list[str], dates: list[str]
+    ) -> dict[str, list[CoinPriceData]]:
+        """Get cryptowatch history price of all markets on multiple dates"""
+        # markets are only retrieved for coins not in the market cache
+        self.markets = self.get_markets(coindata, currencies, self.strictness)
+
+        # convert dates to unix timestamp
+        # api returns wrong date of 1 hour difference
+        dts = {
+            date: helperfunc.convert_str_to_date(date) + timedelta(hours=1)
+            for date in dates
+        }
+        ts_list = [int(dt.timestamp()) for dt in dts.values()]
+
+        # load one time series per market
+        markets = [market for market in self.markets if market.error == ""]
+        self.load_series({market.route: market for market in markets}, ts_list)
+
+        prices: dict[str, list[CoinPriceData]] = {}
+        for date, dt in dts.items():
+            ts = int(dt.timestamp())
+            prices[date] = []
+            for market in markets:
+                series = self.series[market.route]
+                point = series.nearest(ts)
+                if point is None:
+                    prices[date].append(
+                        CoinPriceData(
+                            date=dt,
+                            coin=market.coin,
+                            curr=market.curr,
+                            exchange=market.exchange,
+                            price=math.nan,
+                            volume=math.nan,
+                            active=market.active,
+                            error=series.error or "no data found",
+                        )
+                    )
+                else:
+                    date_found = helperfunc.convert_timestamp(point[0], False)
+                    prices[date].append(
+                        CoinPriceData(
+                            date=date_found + timedelta(hours=-1),  # api returns wrong date
+                            coin=market.coin,
+                            curr=market.curr,
+                            exchange=market.exchange,
+                            price=point[1],
+                            volume=point[2],
+                            active=market.active,
+                        )
                     )
 
-                    # set found coin price data
-                    date = helperfunc.convert_timestamp(resp_price_minimal[0], False)
-                    date = date + timedelta(hours=-1)  # api returns wrong date
-                    price = resp_price_minimal[1]  # open
-                    volume = resp_price_minimal[5]  # volume
-                    error = ""
-                    break
+            prices[date] = self.filter_marketpair_on_volume(
+                prices[date], self.max_markets_per_pair
+            )
+            if self.aggregate:
+                prices[date] = self.aggregate_marketpair(prices[date])
 
-            self.view_update_progress(1, len(self.markets))
-            if "allowance" in resp:
-                allowance = resp["allowance"]
-                self.view_update_progress_text(allowance)
-
-        return CoinPriceData(
-            date=date,
-            coin=coin,
-            curr=curr,
-            exchange=exchange,
-            price=price,
-            volume=volume,
-            active=active,
-            error=error,
-        )
+        return prices
+
+    def get_series_items(
+        self, coin: CoinData, currency: str
+    ) -> list[tuple[str, object]]:
+        """Get the markets of a coin in a currency, one series per exchange"""
+        markets = self.get_markets([coin], [currency], self.strictness)
+        return [(market.exchange, market) for market in markets if market.error == ""]
+
+    def get_ohlc_url(
+        self, item: CoinMarketData, ts_from: int, ts_to: int, resolution: int
+    ) -> str:
+        """Get url of the ohlc candles of a market"""
+        params = {}
+        params["after"] = ts_from
+        params["before"] = ts_to
+        params["periods"] = resolution
+        return self.req.api_url_params(f"{item.route}/ohlc", params)
 
-    def search_price_minimal_timediff(self, prices, ts: int, ms: bool = False):
-        """Search for record in price data with the smallest time difference
+    def parse_ohlc(self, resp: dict, resolution: int) -> "np.ndarray":
+        """Get points from ohlc response, the timestamp is the close time of a candle
 
-        ts = timestamp in sec if ms = False
-        ts = timestamp in msec if ms = True
+        resp['result']['3600'] = [[close time, open, high, low, close, volume, quote volume], ...]
         """
-        timediff_minimal = 10**20
-        price_minimal = []
-        ts = ts * 1000 if ms == True else ts
-        for price in prices:
-            timediff = abs(ts - price[0])
-            if timediff < timediff_minimal:
-                timediff_minimal = timediff
-                price_minimal = price
-        return price_minimal
+        if "allowance" in resp:
+            self.view_update_progress_text(resp["allowance"])
+        candles = resp.get("result", {}).get(str(resolution)) or []
+        return helperfunc.get_columns(candles, 7)[:, :6]
 
     def filter_marketpair_on_volume(
         self, prices: list[CoinPriceData], max_markets_per_pair: int
@@ -237,20 +293,131 @@ class CoinPriceCryptowatch(CoinPrice):
         # make new list of prices with max markets per pair
         new_prices: list[CoinPriceData] = []
         for val_prices in price_per_pair.values():
-            # sort list of dictionaries of same pair on volume
-            val_prices_sorted = sorted(val_prices, key=lambda d: d.volume, reverse=True)
+            # only the first x price items, without sorting the whole list
+            new_prices.extend(
+                heapq.nlargest(max_markets_per_pair, val_prices, key=lambda d: d.volume)
+            )
+
+        return new_prices
+
+    @staticmethod
+    def get_marketpair_stats(
+        prices: list[CoinPriceData],
+    ) -> tuple[list[CoinPriceData], "np.ndarray"]:
+        """Calculate statistics of the markets of every pair over all exchanges
+
+        Prices with a volume are grouped on coin and currency and all groups are
+        calculated at once. Prices without price or volume are not used.
 
-            # get the first x price items
-            for i in range(0, min(len(val_prices_sorted), max_markets_per_pair)):
-                new_prices.append(val_prices_sorted[i])
+        returns list with the first price of every pair and 2d array with per pair
+            the columns vwap, median, low, high, spread, volume, nr of markets
+            spread = (high - low) / median, the relative difference between
+                     the best and the worst price
+        """
+        import numpy as np
+
+        pairs: dict[tuple, int] = {}
+        firsts: list[CoinPriceData] = []
+        codes: list[int] = []
+        for price in prices:
+            key = (price.coin.siteid, price.coin.symbol, price.curr)
+            if key not in pairs:
+                pairs[key] = len(pairs)
+                firsts.append(price)
+            codes.append(pairs[key])
+
+        values = np.array([price.price for price in prices], dtype=np.float64)
+        volumes = np.array([price.volume for price in prices], dtype=np.float64)
+        valid = np.isfinite(values) & np.isfinite(volumes) & (volumes > 0)
+        group = np.array(codes, dtype=np.int64)[valid]
+        values = values[valid]
+        volumes = volumes[valid]
+
+        nr_pairs = len(pairs)
+        counts = np.bincount(group, minlength=nr_pairs)
+        total_volume = np.bincount(group, weights=volumes, minlength=nr_pairs)
+        total_value = np.bincount(group, weights=values * volumes, minlength=nr_pairs)
+
+        stats = np.full((nr_pairs, 7), np.nan)
+        stats[:, 5] = total_volume
+        stats[:, 6] = counts
+        has_data = counts > 0
+        stats[has_data, 0] = total_value[has_data] / total_volume[has_data]
+
+        # sort on pair and price, the median, low and high are then at
+        # fixed positions within every pair
+        order = np.lexsort((values, group))
+        values = values[order]
+        starts = np.cumsum(counts) - counts
+        counts_data = counts[has_data]
+        starts_data = starts[has_data]
+        stats[has_data, 1] = (
+            values[starts_data + (counts_data - 1) // 2]
+            + values[starts_data + counts_data // 2]
+        ) / 2
+        stats[has_data, 2] = values[starts_data]
+        stats[has_data, 3] = values[starts_data + counts_data - 1]
+        stats[has_data, 4] = (stats[has_data, 3] - stats[has_data, 2]) / stats[
+            has_data, 1
+        ]
+
+        return firsts, stats
+
+    def aggregate_marketpair(self, prices: list[CoinPriceData]) -> list[CoinPriceData]:
+        """Consolidate the prices of a market pair on all exchanges to one price
+
+        The price is the volume weighted average price (vwap) of the exchanges,
+        the volume is the total volume, the exchange is 'vwap'
+        """
+        if len(prices) == 0:
+            return prices
 
+        firsts, stats = self.get_marketpair_stats(prices)
+        new_prices: list[CoinPriceData] = []
+        for first, stat in zip(firsts, stats):
+            new_prices.append(
+                CoinPriceData(
+                    date=first.date,
+                    coin=first.coin,
+                    curr=first.curr,
+                    exchange="vwap",
+                    price=stat[0],
+                    volume=stat[5],
+                    active=first.active,
+                    error="" if stat[6] > 0 else first.error or "no volume",
+                    website=first.website,
+                )
+            )
         return new_prices
 
+    def get_marketpair_summary(self, prices: list[CoinPriceData]) -> "pd.DataFrame":
+        """Get the statistics of every market pair over all exchanges
+
+        returns DataFrame with columns coin.siteid, coin.symbol, curr, vwap, median,
+            low, high, spread, volume, nr_markets
+        """
+        import pandas as pd
+
+        firsts, stats = self.get_marketpair_stats(prices)
+        df = pd.DataFrame(
+            stats,
+            columns=["vwap", "median", "low", "high", "spread", "volume", "nr_markets"],
+        )
+        df["nr_markets"] = df["nr_markets"].astype(int)
+        df.insert(0, "coin.siteid", [price.coin.siteid for price in firsts])
+        df.insert(1, "coin.symbol", [price.coin.symbol for price in firsts])
+        df.insert(2, "curr", [price.curr for price in firsts])
+        return df
+
     def get_markets(
         self, coindata: list[CoinData], currencies: list[str], strictness=0
     ) -> list[CoinMarketData]:
         """Get cryptowatch markets for chosen coins
 
+        Markets are kept per (symbol, currencies, strictness), so only
+        new coins are requested. The asset responses are also kept on disk
+        for config.MARKETS_CACHE_TTL seconds by the response cache.
+
         strictness = strictly (0), loose (1) or very loose (2) search for base
                     0: strictly is base exactly equals currency
                     1: loose is base contains currency with 1 extra char in front and/or at the end
@@ -258,84 +425,137 @@ class CoinPriceCryptowatch(CoinPrice):
 
         NOT Doing this anymore: if coin does not exist as base, try as quote
         """
+        key_currencies = tuple(sorted(currencies))
+
+        # request markets of new coins concurrently
+        coins_todo: dict[tuple, CoinData] = {}
+        for coin in coindata:
+            key = (coin.symbol, key_currencies, strictness)
+            if key not in self.markets_cache:
+                coins_todo.setdefault(key, coin)
+
+        markets_error: dict[tuple, list[CoinMarketData]] = {}
+        if len(coins_todo) > 0:
+            # via the view, so nothing is shown when running without terminal
+            self.view_update_progress_text("loading market data")
+            urls = [self.get_markets_url(coin) for coin in coins_todo.values()]
+            resps = self.req.get_many(urls, self.view_update_progress)
+            for (key, coin), resp in zip(coins_todo.items(), resps):
+                markets_coin = self.filter_markets(coin, resp, currencies, strictness)
+                # errors are not kept, they are retried next time
+                if resp["status_code"] == 200:
+                    self.markets_cache[key] = markets_coin
+                else:
+                    markets_error[key] = markets_coin
+
         markets: list[CoinMarketData] = []
         for coin in coindata:
-            url = f"{config.CRYPTOWATCH_URL}/assets/{coin.symbol}"
-            resp = self.req.get_request_response(url)
-
-            if resp["status_code"] == 200:
-                resp_markets = resp["result"]["markets"]
-
-                # check if base or quote exists in result
-                if "base" in resp_markets:
-                    res = resp_markets["base"]
-
-                    # filter active pairs
-                    res = list(filter(lambda r: r["active"] == True, res))
-
-                    if strictness == 0:
-                        # Strict/Exact filter only quote from currencies
-                        res_filter = list(
-                            filter(
-                                lambda r: r["pair"].replace(coin.symbol, "")
-                                in currencies,
-                                res,
-                            )
+            key = (coin.symbol, key_currencies, strictness)
+            markets_coin = self.markets_cache.get(key, markets_error.get(key, []))
+            markets.extend(
+                dataclasses.replace(market, coin=coin) for market in markets_coin
+            )
+
+        return markets
+
+    def get_markets_url(self, coin: CoinData) -> str:
+        """Get url of the asset with all markets of a coin"""
+        return f"{config.CRYPTOWATCH_URL}/assets/{coin.symbol}"
+
+    def invalidate_markets(self, coin: CoinData) -> None:
+        """Remove markets of a coin from the market cache and from disk
+
+        Next time the markets of this coin are requested again
+        """
+        self.markets_cache = {
+            key: val for key, val in self.markets_cache.items() if key[0] != coin.symbol
+        }
+        if self.req.cache is not None:
+            self.req.cache.delete(self.get_markets_url(coin))
+
+    def filter_markets(
+        self, coin: CoinData, resp: dict, currencies: list[str], strictness=0
+    ) -> list[CoinMarketData]:
+        """Filter the markets of one coin from an asset response on currencies
+
+        strictness = see get_markets
+        """
+        markets: list[CoinMarketData] = []
+        if resp["status_code"] == 200:
+            resp_markets = resp["result"]["markets"]
+
+            # check if base or quote exists in result
+            if "base" in resp_markets:
+                res = resp_markets["base"]
+
+                # filter active pairs
+                res = list(filter(lambda r: r["active"] == True, res))
+
+                if strictness == 0:
+                    # Strict/Exact filter only quote from currencies
+                    res_filter = list(
+                        filter(
+                            lambda r: r["pair"].replace(coin.symbol, "") in currencies,
+                            res,
                         )
-                        # filter(lambda r: r['curr'] in currencies, res))
-
-                        # check if markets are found, else don't filter
-                        if len(res_filter) > 0:
-                            res = res_filter
-
-                    if strictness >= 1:
-                        # Loose filter only quote from currencies
-                        res_filter = []
-                        for c in currencies:
-                            if strictness == 1:
-                                # Loose (quote can have 0 or 1 character before and/or after given currency)
-                                res_curr = list(
-                                    filter(
-                                        lambda r: re.match(
-                                            "^" + coin.symbol + "\\w?" + c + "\\w?$",
-                                            r["pair"],
-                                        ),
-                                        res,
-                                    )
-                                )
-                            else:
-                                # Very Loose (quote must contain given currency)
-                                res_curr = list(filter(lambda r: c in r["pair"], res))
-                            res_filter.extend(res_curr)
+                    )
+                    # filter(lambda r: r['curr'] in currencies, res))
+
+                    # check if markets are found, else don't filter
+                    if len(res_filter) > 0:
                         res = res_filter
 
-                    for r in res:
-                        markets.append(
-                            CoinMarketData(
-                                coin=coin,
-                                curr=r["pair"].replace(coin.symbol, ""),
-                                exchange=r["exchange"],
-                                active=r["active"],
-                                pair=r["pair"],
-                                route=r["route"],
+                if strictness >= 1:
+                    # Loose filter only quote from currencies
+                    res_filter = []
+                    for c in currencies:
+                        if strictness == 1:
+                            # Loose (quote can have 0 or 1 character before and/or after given currency)
+                            res_curr = list(
+                                filter(
+                                    lambda r: re.match(
+                                        "^" + coin.symbol + "\\w?" + c + "\\w?$",
+                                        r["pair"],
+                                    ),
+                                    res,
+                                )
                             )
-                        )
+                        else:
+                            # Very Loose (quote must contain given currency)
+                            res_curr = list(filter(lambda r: c in r["pair"], res))
+                        res_filter.extend(res_curr)
+                    res = res_filter
 
-                else:
+                for r in res:
                     markets.append(
                         CoinMarketData(
                             coin=coin,
-                            curr="not data found",
-                            active=False,
-                            error="not data found",
+                            curr=r["pair"].replace(coin.symbol, ""),
+                            exchange=r["exchange"],
+                            active=r["active"],
+                            pair=r["pair"],
+                            route=r["route"],
                         )
                     )
 
             else:
                 markets.append(
                     CoinMarketData(
-                        coin=coin, curr="error", active=False, error=resp["error"]
+                        coin=coin,
+                        curr="not data found",
+                        active=False,
+                        error="not data found",
                     )
                 )
 
+        else:
+            markets.append(
+                CoinMarketData(
+                    coin=coin,
+                    curr="error",
+                    active=False,
+                    error=str(resp.get("error", "error")),
+                )
+            )
+
         return markets
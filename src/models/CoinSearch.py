@@ -1,17 +1,23 @@
 """
 @author: Arno
 @created: 2022-10-13
-@modified: 2023-05-20
+@modified: 2026-10-17
 
 Base Class CoinSearch
 
 """
+import re
+import threading
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
 from enum import Enum, auto
 
+import config
 import src.db.DbHelper as DbHelper
 from src.data.CoinData import CoinData, CoinSearchData
 from src.db.Db import Db
+from src.models.AssetIndex import AssetIndex
+from src.req.AssetSnapshot import AssetSnapshot
 from src.req.RequestHelper import RequestHelper
 
 
@@ -31,6 +37,8 @@ class CoinSearch(ABC):
         self.website_id: int = 0
         self.req = RequestHelper()
         self.search_method: SearchMethod
+        self.search_regex: bool = False
+        self.asset_index: AssetIndex = AssetIndex([], self.get_asset_keys)
 
     @abstractmethod
     def search(self, coin_search: str) -> list[CoinSearchData]:
@@ -38,6 +46,96 @@ class CoinSearch(ABC):
         """
         pass
 
+    @abstractmethod
+    def get_asset_keys(self, asset) -> list[str]:
+        """Get the strings to search for in one asset
+        """
+        pass
+
+    @abstractmethod
+    def convert_assets_to_coinsearchdata(self, resp: list) -> list[CoinSearchData]:
+        """Convert list of assets to list of CoinSearchData
+        """
+        pass
+
+    @abstractmethod
+    def get_asset_urls(self) -> list[str]:
+        """Get the api urls for the list of all assets
+        """
+        pass
+
+    @abstractmethod
+    def set_assets(self, assets: dict[str, list]) -> None:
+        """Set the assets and build the search index
+
+        assets = dictionary with url as key and list of assets as value
+        """
+        pass
+
+    def load_assets(self) -> None:
+        """Load all assets from the snapshots on disk
+
+        Only when there is no snapshot, the assets are downloaded before searching.
+        Snapshots older than config.ASSETS_REFRESH_TIME are refreshed in the background
+        with a conditional request, the search index is updated when they changed.
+        """
+        snapshots = [AssetSnapshot(config.CACHE_PATH, url) for url in self.get_asset_urls()]
+        missing = []
+        stale = []
+        for snapshot in snapshots:
+            if not snapshot.load():
+                missing.append(snapshot)
+            elif snapshot.is_stale(config.ASSETS_REFRESH_TIME):
+                stale.append(snapshot)
+        self._refresh_snapshots(missing)
+        self.set_assets({snapshot.url: snapshot.assets for snapshot in snapshots})
+
+        if len(stale) > 0:
+            thread = threading.Thread(
+                target=self._refresh_assets, args=(snapshots, stale), daemon=True)
+            thread.start()
+
+    def _refresh_assets(self, snapshots: list[AssetSnapshot], stale: list[AssetSnapshot]) -> None:
+        """Refresh stale snapshots and update the assets when changed
+        """
+        if self._refresh_snapshots(stale):
+            self.set_assets({snapshot.url: snapshot.assets for snapshot in snapshots})
+
+    def _refresh_snapshots(self, snapshots: list[AssetSnapshot]) -> bool:
+        """Refresh snapshots, all at the same time
+
+        returns True when assets of one of the snapshots are changed
+        """
+        if len(snapshots) == 0:
+            return False
+        with ThreadPoolExecutor(max_workers=self.req.max_concurrency) as executor:
+            changed = list(executor.map(lambda snapshot: snapshot.refresh(self.req), snapshots))
+        return any(changed)
+
+    def build_asset_index(self, assets: list) -> None:
+        """Build the search index for a newly loaded list of assets
+        """
+        self.asset_index = AssetIndex(assets, self.get_asset_keys)
+
+    def search_id_assets(self, search_str: str) -> list[CoinSearchData]:
+        """Search for coin in list of all assets
+
+        Search on start of id, name or symbol,
+        or with a regular expression when search_regex is set
+        """
+        if self.search_regex:
+            try:
+                resp_coins = self.asset_index.search_regex(search_str)
+            except re.error as e:
+                print(f'Regular expression error: {e}')
+                resp_coins = []
+        else:
+            resp_coins = self.asset_index.search(search_str)
+        return self.convert_assets_to_coinsearchdata(resp_coins)
+
+    def set_search_regex(self, search_regex: bool) -> None:
+        self.search_regex = search_regex
+
     def save_images(self, image_urls: dict, coin_name: str):
         """Save image files for one coin
         """
@@ -1,15 +1,14 @@
 """
 @author: Arno
 @created: 2022-10-15
-@modified: 2023-05-20
+@modified: 2026-10-17
 
 Class CoinSearchAlcor
 
 """
-import re
-
 import config
 import src.func.helperfunc as helperfunc
+import src.models.AlcorMarkets as AlcorMarkets
 from src.data.CoinData import CoinData, CoinSearchData
 from src.data.DbData import DbWebsiteName
 from src.models.CoinSearch import CoinSearch
@@ -25,24 +24,20 @@ class CoinSearchAlcor(CoinSearch):
         self.id_assets: int = 0
         self.chains: list[str] = chains
         super().__init__()
+        self.req.set_rate_limit(config.ALCOR_RATE_LIMIT)
 
     def set_chains(self, chains: list[str]) -> None:
         self.chains = chains
 
-    def search_id_assets(self, search_str: str) -> list[CoinSearchData]:
-        """Search for coin in list of all assets
+    def get_asset_keys(self, asset) -> list[str]:
+        """Get the strings to search for in one asset
+
+        Symbol names and contracts of base and quote token
         """
-        s = search_str.lower()
-        resp_coins = []
-        for asset in self.assets.values():
-            resp_coin = [item for item in asset
-                         if (re.match(s, item['base_token']['symbol']['name'].lower()) or
-                             re.search(s, item['base_token']['str'].lower()) or
-                             re.match(s, item['quote_token']['symbol']['name'].lower()) or
-                             re.search(s, item['quote_token']['str'].lower()))]
-            resp_coins.extend(resp_coin)
-        coinsearch = self.convert_assets_to_coinsearchdata(resp_coins)
-        return coinsearch
+        return [asset['base_token']['symbol']['name'],
+                asset['base_token']['contract'],
+                asset['quote_token']['symbol']['name'],
+                asset['quote_token']['contract']]
 
     def convert_assets_to_coinsearchdata(self, resp: list) -> list[CoinSearchData]:
         """Convert result from site to list of CoinSearchData
@@ -78,21 +73,38 @@ class CoinSearchAlcor(CoinSearch):
         id_date = helperfunc.get_date_identifier()
         if self.id_assets != id(self.chains) + id_date:
             print('----------------loading all assets data--------------')
-            self.assets = self.get_all_assets(self.chains)
+            self.load_assets()
             self.id_assets = id(self.chains) + id_date
 
         # Do search on Alcor assets in memory
         cs_result = self.search_id_assets(coin_search)
         return cs_result
 
-    def get_all_assets(self, chains: list) -> dict:
-        '''Retrieve all assets from alcor api
+    def get_asset_urls(self) -> list[str]:
+        '''Get urls for all assets from alcor api, one per chain
+        '''
+        return [AlcorMarkets.get_markets_url(chain) for chain in self.chains]
+
+    def load_assets(self) -> None:
+        '''Load all assets
+
+        Use the markets already retrieved by the price model in this process,
+        otherwise load from the snapshots
+        '''
+        markets = AlcorMarkets.get_markets_loaded(self.chains, config.ASSETS_REFRESH_TIME)
+        if len(markets) == len(self.chains):
+            self.set_assets({AlcorMarkets.get_markets_url(chain): assets
+                             for chain, assets in markets.items()})
+        else:
+            super().load_assets()
+
+    def set_assets(self, assets: dict[str, list]) -> None:
+        '''Set the assets and build the search index
 
-        returns = dictionary where each key is a chain with a list of string with assets from Alcor
+        self.assets = dictionary where each key is a chain with a list of assets from Alcor
         '''
-        coin_assets = {}
-        for chain in chains:
-            url = f'{config.ALCOR_URL.replace("?", chain)}/markets'
-            resp = self.req.get_request_response(url)
-            coin_assets[chain] = resp['result']
-        return coin_assets
+        self.assets = {chain: assets[url]
+                       for chain, url in zip(self.chains, self.get_asset_urls())
+                       if url in assets}
+        self.build_asset_index(
+            [item for asset in self.assets.values() for item in asset])
@@ -1,7 +1,7 @@
 """
 @author: Arno
 @created: 2022-03-29
-@modified: 2023-05-20
+@modified: 2026-10-17
 
 Coingecko search
 Search id for coins to finally get price from coingecko
@@ -24,8 +24,6 @@ the key coins has a list of the search result of coins
   ],
   'exchanges': [] ...
 """
-import re
-
 import config
 import src.db.DbHelper as DbHelper
 import src.func.helperfunc as helperfunc
@@ -41,6 +39,7 @@ class CoinSearchCoingecko(CoinSearch):
 
     def __init__(self, search_method: SearchMethod = SearchMethod.WEB) -> None:
         super().__init__()
+        self.req.set_rate_limit(config.COINGECKO_RATE_LIMIT)
         self.website = DbWebsiteName.COINGECKO.name.lower()
         self.assets: list = []
         self.id_assets: int = 0
@@ -87,16 +86,10 @@ class CoinSearchCoingecko(CoinSearch):
             # Save image files
             self.save_images(params_image, coin)
 
-    def search_id_assets(self, search_str: str) -> list[CoinSearchData]:
-        """Search for coin in list of all assets
+    def get_asset_keys(self, asset) -> list[str]:
+        """Get the strings to search for in one asset
         """
-        s = search_str.lower()
-        resp_coins = [item for item in self.assets
-                      if (re.match(s, item['id'].lower()) or
-                          re.match(s, item['name'].lower()) or
-                          re.match(s, item['symbol'].lower()))]
-        coinsearch = self.convert_assets_to_coinsearchdata(resp_coins)
-        return coinsearch
+        return [asset['id'], asset['name'], asset['symbol']]
 
     def convert_assets_to_coinsearchdata(self, resp: list) -> list[CoinSearchData]:
         """Convert result from site to list of CoinSearchData
@@ -163,7 +156,7 @@ class CoinSearchCoingecko(CoinSearch):
             id_date = helperfunc.get_date_identifier()
             if self.id_assets != id_date:
                 print('----------------loading all assets data--------------')
-                self.assets = self.get_all_assets()
+                self.load_assets()
                 self.id_assets = id_date
 
             # Search through assets
@@ -173,8 +166,8 @@ class CoinSearchCoingecko(CoinSearch):
             cs_result = self.search_id_web(coin_search)
         return cs_result
 
-    def get_all_assets(self) -> list:
-        """Get all assets from Coingecko
+    def get_asset_urls(self) -> list[str]:
+        """Get url for all assets from Coingecko
 
         result = {
             {'id': 'astroelon',
@@ -186,7 +179,10 @@ class CoinSearchCoingecko(CoinSearch):
             },...
         }
         """
-        url = f'{config.COINGECKO_URL}/coins/list?include_platform=true'
-        resp = self.req.get_request_response(url)
-        assets = resp['result']
-        return assets
+        return [f'{config.COINGECKO_URL}/coins/list?include_platform=true']
+
+    def set_assets(self, assets: dict[str, list]) -> None:
+        """Set the assets and build the search index
+        """
+        self.assets = [item for asset in assets.values() for item in asset]
+        self.build_asset_index(self.assets)
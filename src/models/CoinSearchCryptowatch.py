@@ -1,13 +1,11 @@
 """
 @author: Arno
 @created: 2022-04-23
-@modified: 2023-05-20
+@modified: 2026-10-17
 
 Cryptowat.ch search
 
 """
-import re
-
 import config
 import src.func.helperfunc as helperfunc
 from src.data.CoinData import CoinData, CoinSearchData
@@ -27,17 +25,12 @@ class CoinSearchCryptowatch(CoinSearch):
 
         # Update header of request session with user API key
         self.req.update_header({'X-CW-API-Key': config.CRYPTOWATCH_API})
+        self.req.set_rate_limit(config.CRYPTOWATCH_RATE_LIMIT)
 
-    def search_id_assets(self, search_str: str) -> list[CoinSearchData]:
-        """Search for coin in list of all assets
+    def get_asset_keys(self, asset) -> list[str]:
+        """Get the strings to search for in one asset
         """
-        s = search_str.lower()
-        resp_coins = [item for item in self.assets
-                      if (re.match(s, item['sid'].lower()) or
-                          re.match(s, item['name'].lower()) or
-                          re.match(s, item['symbol'].lower()))]
-        coinsearch = self.convert_assets_to_coinsearchdata(resp_coins)
-        return coinsearch
+        return [asset['sid'], asset['name'], asset['symbol']]
 
     def convert_assets_to_coinsearchdata(self, resp: list) -> list[CoinSearchData]:
         """Convert result from site to list of CoinSearchData
@@ -69,17 +62,20 @@ class CoinSearchCryptowatch(CoinSearch):
         id_date = helperfunc.get_date_identifier()
         if self.id_assets != id_date:
             print('----------------loading all assets data--------------')
-            self.assets = self.get_all_assets()
+            self.load_assets()
             self.id_assets = id_date
 
         # Do search on cryptowatch assets in memory
         cs_result = self.search_id_assets(coin_search)
         return cs_result
 
-    def get_all_assets(self) -> list:
-        '''Retrieve all assets from cryptowatch api
+    def get_asset_urls(self) -> list[str]:
+        '''Get url for all assets from cryptowatch api
+        '''
+        return [f'{config.CRYPTOWATCH_URL}/assets']
+
+    def set_assets(self, assets: dict[str, list]) -> None:
+        '''Set the assets and build the search index
         '''
-        url = f'{config.CRYPTOWATCH_URL}/assets'
-        resp = self.req.get_request_response(url)
-        coin_assets = resp['result']
-        return coin_assets
+        self.assets = [item for asset in assets.values() for item in asset]
+        self.build_asset_index(self.assets)
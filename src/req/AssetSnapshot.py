@@ -0,0 +1,96 @@
+"""
+@author: Arno
+@created: 2026-10-17
+@modified: 2026-10-17
+
+Snapshot on disk of a list of all assets from a website
+
+"""
+import gzip
+import hashlib
+import json
+import os
+import time
+
+from src.req.RequestHelper import RequestHelper
+
+
+class AssetSnapshot:
+    """List of assets of one url, stored as compressed json file
+
+    The fetch time and the ETag / Last-Modified validators are stored with the assets,
+    so a refresh can be a conditional request
+
+    constructor:
+        path = folder for the snapshot files
+        url = api url of the asset list
+    """
+
+    def __init__(self, path: str, url: str):
+        self.url = url
+        self.assets: list = []
+        self.fetched: float = 0
+        self.etag: str = ''
+        self.last_modified: str = ''
+        name = hashlib.sha256(url.encode()).hexdigest()[:16]
+        self.filename = os.path.join(path, f'assets_{name}.json.gz')
+
+    def load(self) -> bool:
+        """Load the snapshot from disk
+
+        returns False when there is no snapshot
+        """
+        try:
+            with gzip.open(self.filename, 'rt', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return False
+        self.assets = data['assets']
+        self.fetched = data['fetched']
+        self.etag = data.get('etag', '')
+        self.last_modified = data.get('last_modified', '')
+        return True
+
+    def save(self) -> None:
+        """Save the snapshot to disk
+
+        Written to a temporary file first, so a snapshot is never half written
+        """
+        folder = os.path.dirname(self.filename)
+        if folder != '':
+            os.makedirs(folder, exist_ok=True)
+        data = {'url': self.url,
+                'fetched': self.fetched,
+                'etag': self.etag,
+                'last_modified': self.last_modified,
+                'assets': self.assets}
+        tmp_filename = f'{self.filename}.tmp'
+        with gzip.open(tmp_filename, 'wt', encoding='utf-8') as f:
+            json.dump(data, f, separators=(',', ':'))
+        os.replace(tmp_filename, self.filename)
+
+    def is_stale(self, max_age: float) -> bool:
+        """Check if the snapshot is older than max_age seconds
+        """
+        return time.time() - self.fetched > max_age
+
+    def refresh(self, req: RequestHelper) -> bool:
+        """Refresh the snapshot with a conditional request and save it
+
+        returns True when the assets are changed
+        """
+        resp = req.get_request_response_conditional(
+            self.url, self.etag, self.last_modified)
+        if resp['status_code'] == 304:
+            self.fetched = time.time()
+            self.save()
+            return False
+        if resp['status_code'] != 200 or 'result' not in resp:
+            print(f'Unable to refresh assets from {self.url}')
+            return False
+        self.assets = resp['result']
+        self.fetched = time.time()
+        self.etag = resp.get('etag', '')
+        self.last_modified = resp.get('last_modified', '')
+        self.save()
+        return True
@@ -0,0 +1,119 @@
+"""
+@author: Arno
+@created: 2026-10-17
+@modified: 2026-10-17
+
+Token bucket rate limiter to pace requests to an API
+
+"""
+import threading
+import time
+
+# pause in seconds when the allowance of a website is used up,
+# doubled for every next response without allowance
+ALLOWANCE_BACKOFF_MIN = 60
+ALLOWANCE_BACKOFF_MAX = 3600
+
+
+class RateLimiter:
+    """Token bucket rate limiter, can be shared between threads
+
+    Every request takes one token, tokens are refilled with a constant rate.
+    When no token is available, acquire waits until there is one.
+
+    constructor:
+        rate = maximum number of requests per minute, 0 is no limit
+        burst = maximum number of tokens in the bucket
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate: float = rate / 60  # tokens per second
+        self.capacity: float = max(1, burst)
+        self.tokens: float = self.capacity
+        self.updated: float = time.monotonic()
+        self.paused_until: float = 0
+        self.backoff: float = 0
+        self.lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        """Add the tokens for the time passed since last update"""
+        if now > self.updated:
+            self.tokens = min(
+                self.capacity, self.tokens + (now - self.updated) * self.rate
+            )
+            self.updated = now
+
+    def acquire(self) -> float:
+        """Take one token, wait until a token is available
+
+        returns the time waited in seconds
+        """
+        waited = 0.0
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                if now < self.paused_until:
+                    wait = self.paused_until - now
+                elif self.rate <= 0:
+                    return waited
+                else:
+                    self._refill(now)
+                    if self.tokens >= 1:
+                        self.tokens -= 1
+                        return waited
+                    wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+            waited += wait
+
+    def pause(self, seconds: float) -> None:
+        """Stop handing out tokens for some time
+
+        Used for feedback of a Retry-After from the website
+        After the pause the bucket starts empty
+        """
+        with self.lock:
+            until = time.monotonic() + seconds
+            if until > self.paused_until:
+                self.paused_until = until
+                self.tokens = 0
+                self.updated = until
+
+    def limit_tokens(self, available: float) -> None:
+        """Limit the tokens in the bucket to what the website still allows
+
+        Used for feedback of the remaining allowance from the website
+        """
+        with self.lock:
+            self._refill(time.monotonic())
+            self.tokens = min(self.tokens, max(0, available))
+
+    def limit_allowance(self, remaining: float, cost: float) -> float:
+        """Pace the requests with the remaining allowance from the website
+
+        When the allowance is enough for another request, the tokens are limited
+        to the number of requests still allowed
+        When the allowance is used up, no tokens are handed out for a time that
+        doubles with every response without allowance, so the website is not
+        requested until its allowance is reset
+
+        remaining = allowance left, cost = allowance used by the last request
+        returns the pause in seconds, 0 when not paused
+        """
+        if remaining >= cost:
+            with self.lock:
+                self.backoff = 0
+            self.limit_tokens(remaining / cost)
+            return 0
+
+        with self.lock:
+            now = time.monotonic()
+            if now < self.paused_until:
+                # responses of requests sent before the pause, already paused
+                return self.paused_until - now
+            if self.backoff == 0:
+                self.backoff = ALLOWANCE_BACKOFF_MIN
+            else:
+                self.backoff = min(2 * self.backoff, ALLOWANCE_BACKOFF_MAX)
+            backoff = self.backoff
+        self.pause(backoff)
+        return backoff
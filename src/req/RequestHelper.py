@@ -1,32 +1,56 @@
 """
 @author: Arno
 @created: 2022-04-21
-@modified: 2023-05-20
+@modified: 2026-10-17
 
 Request URL Helper to get response from API
 """
 
+import asyncio
 import ssl
+import threading
 import time
-from typing import Callable
+from typing import Callable, Optional
+from urllib.parse import urlparse
 
 import requests
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 
+import config
+from src.req.RateLimiter import RateLimiter
+from src.req.ResponseCache import ResponseCache
+
 
 class RequestHelper:
     """
     Functions to help requesting response from an API
     """
 
-    def __init__(self):
-        self.session = self._init_session()
+    def __init__(
+        self,
+        max_concurrency: int = config.REQUEST_MAX_CONCURRENCY,
+        cache: Optional[ResponseCache] = None,
+    ):
+        self.max_concurrency: int = max(1, max_concurrency)
+        self.cache = cache
+        self.cache_current: bool = True
+        self.session = self._init_session(self.max_concurrency)
         self.view_update_waiting_time: Callable[[int], None]
+        self.rate_limit: float = 0
+        self.rate_burst: int = 1
+        self.limiters: dict[str, RateLimiter] = {}
+        self.limiters_lock = threading.Lock()
+        self.max_per_host: int = max(1, config.REQUEST_MAX_PER_HOST)
+        self.host_semaphores: dict[str, threading.BoundedSemaphore] = {}
 
     @staticmethod
-    def _init_session():
-        """Initialization of the session"""
+    def _init_session(pool_size: int):
+        """Initialization of the session
+
+        pool_size = number of connections kept per host, equal to the maximum
+                    number of concurrent requests
+        """
         session = requests.Session()
         # session.headers.update({'Accept': 'application/json'})
         retry = Retry(
@@ -35,7 +59,9 @@ class RequestHelper:
             respect_retry_after_header=False,  # False: show sleep time via this class
             status_forcelist=[502, 503, 504],
         )
-        adapter = HTTPAdapter(max_retries=retry)
+        adapter = HTTPAdapter(
+            max_retries=retry, pool_connections=pool_size, pool_maxsize=pool_size
+        )
         session.mount("http://", adapter)
         session.mount("https://", adapter)
         return session
@@ -47,29 +73,168 @@ class RequestHelper:
         """
         self.session.headers.update(params)
 
+    def set_rate_limit(self, rate: float, burst: int = 1) -> None:
+        """Set the rate limit for requests
+
+        Each host gets its own token bucket,
+        so every Alcor chain is limited separately
+
+        rate = maximum number of requests per minute per host, 0 is no limit
+        burst = maximum number of requests at once before pacing starts
+        """
+        with self.limiters_lock:
+            self.rate_limit = rate
+            self.rate_burst = burst
+            self.limiters = {}
+
+    def set_cache_current(self, use_cache: bool) -> None:
+        """Use cached responses of current prices or always request them
+
+        When not used, responses of current prices are also not stored
+        Historical responses and markets are still taken from the cache
+
+        use_cache = False to always request current prices (for polling)
+        """
+        self.cache_current = use_cache
+
+    def get_rate_limiter(self, url: str) -> RateLimiter:
+        """Get the rate limiter for the host of the url"""
+        host = urlparse(url).netloc
+        with self.limiters_lock:
+            if host not in self.limiters:
+                self.limiters[host] = RateLimiter(self.rate_limit, self.rate_burst)
+            return self.limiters[host]
+
+    def get_host_semaphore(self, url: str) -> threading.BoundedSemaphore:
+        """Get the semaphore limiting the connections to the host of the url"""
+        host = urlparse(url).netloc
+        with self.limiters_lock:
+            if host not in self.host_semaphores:
+                self.host_semaphores[host] = threading.BoundedSemaphore(
+                    self.max_per_host
+                )
+            return self.host_semaphores[host]
+
     def get_request_response(self, url: str, stream=False) -> dict:
         """general request url function
 
+        Blocking request of one url, for more urls at once use get_many
+
         url = api url for request
         """
+        return self._fetch(url, stream)
+
+    def get_request_response_conditional(
+        self, url: str, etag: str = "", last_modified: str = ""
+    ) -> dict:
+        """Request url only when changed since an earlier response
+
+        url = api url for request
+        etag, last_modified = validators of the earlier response
+        returns dictionary with status_code 304 when not modified,
+                otherwise like get_request_response,
+                both with the new validators in keys etag and last_modified
+        """
+        headers = {}
+        if etag != "":
+            headers["If-None-Match"] = etag
+        if last_modified != "":
+            headers["If-Modified-Since"] = last_modified
+        return self._fetch(url, headers=headers)
+
+    def get_many(
+        self,
+        urls: list[str],
+        fn_progress: Optional[Callable[[int, int], None]] = None,
+    ) -> list[dict]:
+        """Request multiple urls concurrently
+
+        At most max_concurrency requests are running at the same time
+
+        urls = list of api urls for request
+        fn_progress = optional function called with (nr done, total) after each response
+        returns list of response dictionaries, in the same order as urls
+        """
+        if len(urls) == 0:
+            return []
+        return asyncio.run(self.get_many_async(urls, fn_progress))
+
+    async def get_many_async(
+        self,
+        urls: list[str],
+        fn_progress: Optional[Callable[[int, int], None]] = None,
+    ) -> list[dict]:
+        """Request multiple urls concurrently from within an event loop
+
+        The blocking requests session is run in the default thread pool,
+        so the retry adapter and the 429 handling are the same for all requests
+
+        urls = list of api urls for request
+        fn_progress = optional function called with (nr done, total) after each response
+        returns list of response dictionaries, in the same order as urls
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        total = len(urls)
+        nr_done = 0
+
+        async def fetch(url: str) -> dict:
+            nonlocal nr_done
+            async with semaphore:
+                resp = await asyncio.to_thread(self._fetch, url)
+            nr_done += 1
+            if fn_progress is not None:
+                fn_progress(nr_done, total)
+            return resp
+
+        return list(await asyncio.gather(*(fetch(url) for url in urls)))
+
+    def _fetch(self, url: str, stream=False, headers: Optional[dict] = None) -> dict:
+        """Request one url and convert the response to a dictionary
+
+        Responses of historical endpoints are served from the cache when available
+
+        url = api url for request
+        headers = extra headers for a conditional request, the cache is not used
+        returns dictionary with the json result and key status_code
+        """
+        ttl = 0.0
+        use_cache = False
+        if self.cache is not None and not stream and headers is None:
+            ttl = self.cache.get_ttl(url)
+            use_cache = self.cache_current or ttl != self.cache.ttl_short
+            if ttl > 0 and use_cache:
+                resp_cached = self.cache.get(url)
+                if resp_cached is not None:
+                    return resp_cached
+
         resp = {}
         response = requests.Response
         request_timeout = 60
         verify = True
         requests.packages.urllib3.disable_warnings()  # type: ignore
 
+        limiter = self.get_rate_limiter(url)
+        host_semaphore = self.get_host_semaphore(url)
+
         while True:
             try:
-                response = self.session.get(
-                    url, timeout=request_timeout, stream=stream, verify=verify
-                )
+                limiter.acquire()
+                with host_semaphore:
+                    response = self.session.get(
+                        url,
+                        timeout=request_timeout,
+                        stream=stream,
+                        verify=verify,
+                        headers=headers,
+                    )
                 if response.status_code == 429:
                     if "Retry-After" in response.headers.keys():
                         sleep_time = int(response.headers["Retry-After"]) + 1
-                        self.sleep_print_time(sleep_time)
                     else:
                         sleep_time = 65
-                        self.sleep_print_time(sleep_time)
+                    # hold all other requests to this host as well
+                    limiter.pause(sleep_time)
+                    self.sleep_print_time(sleep_time)
                 else:
                     break  # raise requests.exceptions.RequestException
             except requests.exceptions.SSLError as e:
@@ -100,6 +265,13 @@ class RequestHelper:
                 flush=True,
             )
 
+        validators = {}
+        if headers is not None:
+            validators["etag"] = response.headers.get("ETag", "")
+            validators["last_modified"] = response.headers.get("Last-Modified", "")
+            if response.status_code == 304:
+                return {"status_code": 304, **validators}
+
         try:
             # get json from response, with type dict (mostly) or type list (Alcor exchange)
             resp_unknown = response.json()
@@ -113,6 +285,14 @@ class RequestHelper:
         except Exception as e:
             print("JSON Exception: ", e)
 
+        # feedback of remaining allowance (Cryptowatch) to the rate limiter
+        allowance = resp.get("allowance")
+        if isinstance(allowance, dict) and allowance.get("cost", 0) > 0:
+            if "remaining" in allowance:
+                pause = limiter.limit_allowance(allowance["remaining"], allowance["cost"])
+                if pause > 0:
+                    print(f"\rAllowance used up, waiting {pause:.0f} sec before next request")
+
         try:
             response.raise_for_status()
             resp.update({"status_code": response.status_code})
@@ -132,6 +312,10 @@ class RequestHelper:
             resp.update({"status_code": "error"})
             resp.update({"prices": []})
 
+        if ttl > 0 and use_cache and resp.get("status_code") == 200:
+            self.cache.set(url, resp, ttl)  # type: ignore
+
+        resp.update(validators)
         return resp
 
     def api_url_params(self, url: str, params: dict, api_url_has_params=False):
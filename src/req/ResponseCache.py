@@ -0,0 +1,177 @@
+"""
+@author: Arno
+@created: 2026-10-17
+@modified: 2026-10-17
+
+Persistent cache on disk for responses of an API
+
+Historical price data never changes, so these responses are kept forever.
+Current prices are kept for a short time.
+"""
+import hashlib
+import json
+import math
+import os
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from urllib.parse import parse_qsl, urlencode, urlparse
+
+# parameters that are not part of the content, like personal api keys
+IGNORED_PARAMS = {"x_cg_demo_api_key"}
+
+# time after which a closed historical window can still change
+HIST_SETTLE_TIME = 3600
+
+
+class ResponseCache:
+    """Cache for responses, stored in a SQLite database, can be shared between threads
+
+    The key is the hash of the normalized url, without api keys.
+    The time to live depends on the endpoint, see get_ttl
+
+    constructor:
+        path = folder for the cache database
+        ttl_short = time to live in seconds for current prices
+        ttl_markets = time to live in seconds for the markets of an asset (Cryptowatch)
+    """
+
+    def __init__(self, path: str, ttl_short: float = 60, ttl_markets: float = 0):
+        self.ttl_short = ttl_short
+        self.ttl_markets = ttl_markets
+        self.lock = threading.Lock()
+        if path != "":
+            os.makedirs(path, exist_ok=True)
+        self.conn = sqlite3.connect(
+            os.path.join(path, "responses.db"), timeout=10, check_same_thread=False
+        )
+        self.conn.execute(
+            """CREATE TABLE IF NOT EXISTS response (
+                key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                expires REAL,
+                data TEXT NOT NULL
+                )
+            """
+        )
+        self.conn.commit()
+
+    @staticmethod
+    def normalize_url(url: str) -> str:
+        """Normalize url, sorted parameters and without api keys"""
+        parts = urlparse(url)
+        params = sorted(
+            (key, value)
+            for key, value in parse_qsl(parts.query, keep_blank_values=True)
+            if key not in IGNORED_PARAMS
+        )
+        return f"{parts.scheme}://{parts.netloc.lower()}{parts.path}?{urlencode(params)}"
+
+    @staticmethod
+    def get_key(url: str) -> str:
+        """Get the content key of an url"""
+        return hashlib.sha256(ResponseCache.normalize_url(url).encode()).hexdigest()
+
+    def get_ttl(self, url: str) -> float:
+        """Get the time to live of the response of an url
+
+        returns math.inf for closed historical windows,
+                ttl_short for current prices
+                0 for not caching
+        """
+        parts = urlparse(url)
+        path = parts.path
+        params = dict(parse_qsl(parts.query))
+        ts_closed = time.time() - HIST_SETTLE_TIME
+
+        # historical windows (Coingecko, Alcor: 'to', Cryptowatch: 'before')
+        if path.endswith(("/market_chart/range", "/charts", "/ohlc")):
+            ts_to = params.get("to", params.get("before"))
+            if ts_to is not None and float(ts_to) < ts_closed:
+                return math.inf
+            return self.ttl_short
+
+        # historical day (Coingecko)
+        if path.endswith("/history"):
+            try:
+                dt = datetime.strptime(params["date"], "%d-%m-%Y_%H:%M")
+            except (KeyError, ValueError):
+                return 0
+            dt = dt.replace(tzinfo=timezone.utc) + timedelta(days=1)
+            if dt.timestamp() < ts_closed:
+                return math.inf
+            return self.ttl_short
+
+        # markets of an asset (Cryptowatch)
+        if re.search(r"/assets/[^/]+$", path):
+            return self.ttl_markets
+
+        # current prices
+        if (path.endswith(("/simple/price", "/summary", "/markets/summaries", "/markets/prices"))
+                or "/simple/token_price/" in path):
+            return self.ttl_short
+
+        return 0
+
+    def get(self, url: str) -> Optional[dict]:
+        """Get a response from the cache
+
+        returns None when not found or expired, or when the cache can not be read
+                (locked or corrupt file), then the url is requested again
+        """
+        try:
+            with self.lock:
+                row = self.conn.execute(
+                    "SELECT expires, data FROM response WHERE key = ?",
+                    (self.get_key(url),),
+                ).fetchone()
+        except sqlite3.Error as e:
+            print(f"Response cache not read: {e}")
+            return None
+        if row is None:
+            return None
+        expires, data = row
+        if expires is not None and expires < time.time():
+            return None
+        return json.loads(data)
+
+    def set(self, url: str, resp: dict, ttl: float) -> None:
+        """Store a response in the cache
+
+        ttl = time to live in seconds, math.inf is forever
+        When the cache can not be written (locked or corrupt file), the response
+        is not stored
+        """
+        expires = None if math.isinf(ttl) else time.time() + ttl
+        with self.lock:
+            try:
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO response (key, url, expires, data) VALUES(?,?,?,?)",
+                    (self.get_key(url), self.normalize_url(url), expires, json.dumps(resp)),
+                )
+                self.conn.commit()
+            except sqlite3.Error as e:
+                print(f"Response cache not written: {e}")
+                self.rollback()
+
+    def delete(self, url: str) -> None:
+        """Remove a response from the cache"""
+        with self.lock:
+            try:
+                self.conn.execute(
+                    "DELETE FROM response WHERE key = ?", (self.get_key(url),)
+                )
+                self.conn.commit()
+            except sqlite3.Error as e:
+                print(f"Response cache not written: {e}")
+                self.rollback()
+
+    def rollback(self) -> None:
+        """Undo an unfinished write, so the cache file is not kept locked"""
+        try:
+            self.conn.rollback()
+        except sqlite3.Error:
+            pass
@@ -1,27 +1,35 @@
 """
 @author: Arno
 @created: 2022-12-26
-@modified: 2023-05-20
+@modified: 2026-10-17
 
 Command editor UI for get prices of coins on website / exchanges
 
 """
 
+import hashlib
 import json
 import re
 import shlex
 import sys
-from dataclasses import asdict
 from datetime import datetime
 from pathlib import Path
-from typing import Protocol
-
-import pandas as pd
+from typing import TYPE_CHECKING, Optional, Protocol
 
 import config
 import src.func.helperfunc as helperfunc
 from src.data.CoinData import CoinData, CoinPriceData
 from src.data.CoinViewData import Command, OutputFileType, PriceFunction
+from src.data.DbData import DbResultStatus, DbWebsiteName
+from src.data.PriceBatch import PriceBatch
+from src.exporters.PriceExporter import PriceExporter
+from src.exporters.PriceExporterCsv import PriceExporterCsv
+from src.exporters.PriceExporterParquet import PriceExporterParquet
+from src.exporters.PriceExporterXlsx import PriceExporterXlsx
+
+# pandas is imported in the methods using it, it takes most of the startup time
+if TYPE_CHECKING:
+    import pandas as pd
 
 
 class PriceController(Protocol):
@@ -33,35 +41,56 @@ class PriceController(Protocol):
 
     def get_price_hist_marketchart(self, date: str) -> list[CoinPriceData]: ...
 
+    def get_price_hist_marketchart_dates(
+        self, dates: list[str]
+    ) -> dict[str, list[CoinPriceData]]: ...
+
+    def get_coin_data(self) -> list[CoinData]: ...
+
+    def get_currency_data(self) -> list[str]: ...
+
     def set_currency_data(self, currency_data: list[str]) -> None: ...
 
     def set_coin_data(self, coin_data: list[CoinData]) -> None: ...
 
     def load_coin_data_db(self) -> None: ...
 
+    def save_price_data(self, price_data: list[CoinPriceData]) -> DbResultStatus: ...
+
 
 class CoinPriceViewCli:
     """UI class for getting prices in command editor"""
 
-    def __init__(self) -> None:
+    def __init__(self, quiet: bool = False) -> None:
+        """Init of the view
+
+        quiet = no progress and price tables printed, for running without terminal
+        """
         self.price_data: list[CoinPriceData] = []
         self.last_date: str
         self.last_fn: PriceFunction
         self.chain: str = ""
+        self.quiet = quiet
 
     def update_progress(self, nr: int, total: int) -> None:
         """Show progress to standard output"""
+        if self.quiet:
+            return
         print(f"\rRetrieving nr {nr:3d} of {total}", end="", flush=True)
         # sys.stdout.write(f'Retrieving nr {nr:3d} of {total}\r')
         # sys.stdout.flush()
 
     def update_progress_text(self, text: str) -> None:
         """Show progress text on same row"""
+        if self.quiet:
+            return
         text = json.dumps(text)[1:50]
         print("\r" + text.rjust(80), end="", flush=True)
 
     def update_waiting_time(self, time: int) -> None:
         """Show waiting time"""
+        if self.quiet:
+            return
         print(
             f"\r\t\t\t\tWaiting for retry, {time:3d} seconds remaining.",
             end="",
@@ -73,43 +102,116 @@ class CoinPriceViewCli:
         control: PriceController,
         pricedata: list[CoinPriceData],
         filetype: OutputFileType,
-    ) -> None:
-        """Write a dataframe to a csv file and/or excel file
+    ) -> bool:
+        """Write a dataframe to a csv, excel or parquet file
 
         filename = config.OUTPUT_PATH+websitename+method+date.filetype
+        returns True when the file is written
         """
         if pricedata == []:
             print("Empty pricedata list, nothing to save")
-            return
+            return False
 
         df = self._convert_pricedata_to_df(pricedata)
 
+        filepath = self.get_filepath(
+            control.get_website(), self.last_fn.value, self.last_date, filetype
+        )
+
+        try:
+            with self.get_exporter(filetype, filepath) as exporter:
+                exporter.write(df)
+        except (OSError, ImportError, ValueError) as e:
+            print(f"Error writing file {filepath}: {e}", file=sys.stderr)
+            return False
+
+        print(f"File written: {filepath}")
+        return True
+
+    def get_exporter(
+        self, filetype: OutputFileType, filepath: Path, append: bool = False
+    ) -> PriceExporter:
+        """Get the exporter for writing price data in batches to a file type
+
+        append = add to an existing file instead of replacing it
+        """
+        match filetype:
+            case OutputFileType.CSV:
+                return PriceExporterCsv(filepath, append=append)
+            case OutputFileType.PARQUET:
+                return PriceExporterParquet(filepath, append=append)
+            case _:
+                return PriceExporterXlsx(filepath)
+
+    def get_filepath(
+        self, website: str, fn_name: str, date: str, filetype: OutputFileType
+    ) -> Path:
+        """Get the path of the output file and create the folder
+
+        filename = config.OUTPUT_PATH+websitename+method+date.filetype
+        """
         outputpath = config.OUTPUT_PATH
         if outputpath != "":
             outputpath = f"{outputpath}\\"
 
-        website = control.get_website()
-        file_str = f"{outputpath}{website}_{self.last_fn.value}_{self.last_date}.{filetype.name.lower()}"
+        file_str = f"{outputpath}{website}_{fn_name}_{date}.{filetype.name.lower()}"
         file_str = re.sub(r"[:;,!@#$%^&*()]", "", file_str)
         filepath = Path(file_str)
         filepath.parent.mkdir(parents=True, exist_ok=True)
+        return filepath
 
-        if filetype == OutputFileType.CSV:
-            df.to_csv(filepath)
+    def save_to_db(self, control: PriceController, pricedata: list[CoinPriceData]) -> bool:
+        """Save price data in the database and show result
 
-        if filetype == OutputFileType.XLSX:
-            # remove timezone, because excel cannot handle this
-            df["date"] = helperfunc.remove_tz(df["date"])
-            df.to_excel(filepath)
+        returns True when the prices are saved
+        """
+        if pricedata == []:
+            print("Empty pricedata list, nothing to save")
+            return False
+
+        result = control.save_price_data(pricedata)
+        match result:
+            case DbResultStatus.NO_DATABASE:
+                print("No database connection", file=sys.stderr)
+            case DbResultStatus.INSERT_ERROR:
+                print("Error saving prices to database", file=sys.stderr)
+            case DbResultStatus.INSERT_OK:
+                print(f"{len(pricedata)} prices saved to database")
+        return result == DbResultStatus.INSERT_OK
+
+    def show_poll_result(
+        self,
+        website: str,
+        nr_prices: int,
+        result: Optional[DbResultStatus],
+        error: str = "",
+    ) -> None:
+        """Show one line with the result of a polling tick
 
-        print(f"File written: {filepath}")
+        error = message of an exception during the tick, empty when none
+        """
+        date = datetime.now().isoformat(timespec="seconds")
+        if error != "":
+            print(f"{date} {website}: tick failed, {error}", file=sys.stderr)
+            return
+        match result:
+            case None:
+                print(f"{date} {website}: no prices retrieved", file=sys.stderr)
+            case DbResultStatus.INSERT_OK:
+                print(f"{date} {website}: {nr_prices} prices saved to database")
+            case _:
+                print(f"{date} {website}: {nr_prices} prices not saved, {result.name}", file=sys.stderr)
 
     def print_coinpricedata(self, message: str, pricedata: list[CoinPriceData]) -> None:
         """Print price data to output"""
+        if self.quiet:
+            return
         if pricedata == []:
             print("Empty pricedata list, nothing to print")
             return
 
+        import pandas as pd
+
         # init pandas displaying
         pd.set_option("display.max_rows", None)
         pd.set_option("display.max_columns", None)
@@ -122,12 +224,12 @@ class CoinPriceViewCli:
         print(df)
         print()
 
-    def _convert_pricedata_to_df(self, pricedata: list[CoinPriceData]) -> pd.DataFrame:
+    def _convert_pricedata_to_df(self, pricedata: list[CoinPriceData]) -> "pd.DataFrame":
         """Converts list of objects to a pandas DataFrame
 
-        json_normalize is used this way to flatten the coindata object inside the pricedata
+        The columns are flattened via PriceBatch, coin fields are named coin.field
         """
-        df = pd.json_normalize(data=[asdict(obj) for obj in pricedata])
+        df = PriceBatch.from_prices(pricedata).to_dataframe()
         df.sort_values(
             by=["coin.name", "curr"], key=lambda col: col.str.lower(), inplace=True
         )
@@ -135,6 +237,8 @@ class CoinPriceViewCli:
 
     def print_markets(self, markets) -> None:
         """Print cryptowatch markets"""
+        import pandas as pd
+
         print()
         if len(markets) == 0:
             print("No market data loaded\n")
@@ -163,10 +267,14 @@ class CoinPriceViewCli:
             "Curr currency_id - use the currency id (can be multiple), defaults to btc,eth,eur,usd"
         )
         print("Chain chain_id - change chain, only used for Alcor website")
+        print(
+            "(B)ackfill start end [step] [filetype] - write historical prices via market chart from start to end date to a csv (default) or parquet file, step is hour, day (default) or week"
+        )
         print("XLS - Write the retrieved data to an xls-file")
         print("CSV - Write the retrieved data to an csv-file")
+        print("Store - Save the retrieved data in the price table of the database")
         print(
-            "(A)uto date [filetype] - do all types and write to xls or csv, defaults to both"
+            "(A)uto [date] [filetype] - do all types and write to xls, csv, parquet or db, defaults to xls and csv"
         )
         print()
 
@@ -193,6 +301,139 @@ class CoinPriceViewCli:
             "* History price of coins via marketchart", self.price_data
         )
 
+    def price_backfill(
+        self,
+        control: PriceController,
+        start: str,
+        end: str,
+        step: str,
+        filetype: OutputFileType = OutputFileType.CSV,
+    ) -> None:
+        """Write historical prices via marketchart for a range of dates to one file
+
+        The dates are retrieved and appended to the file in batches
+        The file name has the start, step and coins, not the end
+        Dates already in the file are skipped, so an interrupted backfill can be resumed
+        or extended to a later end
+
+        filetype = csv or parquet, xlsx is written at once at the end
+        """
+        try:
+            dates = helperfunc.get_date_range(start, end, step)
+        except ValueError as e:
+            print(e)
+            return
+
+        # the file is the same for a later end, so a backfill can be extended
+        self.last_date = (
+            f"{dates[0][:16]}_{step}_{self.get_coin_set_key(control)}" if dates else start
+        )
+        self.last_fn = PriceFunction.BACKFILL
+        filepath = self.get_filepath(
+            control.get_website(), self.last_fn.value, self.last_date, filetype
+        )
+
+        import numpy as np
+        import pandas as pd
+
+        with self.get_exporter(filetype, filepath, append=True) as exporter:
+            # skip dates already written
+            dates_done = exporter.read_column("target")
+            if dates_done != set():
+                dates = [date for date in dates if date not in dates_done]
+                print(f"Resuming backfill, {len(dates_done)} dates already in {filepath}")
+
+            batch_size = config.BACKFILL_BATCH_SIZE
+            for i in range(0, len(dates), batch_size):
+                batch = dates[i : i + batch_size]
+                print(f"\rBackfill dates {i + 1} to {i + len(batch)} of {len(dates)}")
+                prices = control.get_price_hist_marketchart_dates(batch)
+
+                price_batch = PriceBatch()
+                for pricedata in prices.values():
+                    price_batch.extend(pricedata)
+                if len(price_batch) == 0:
+                    continue
+
+                df = price_batch.to_dataframe()
+                counts = [len(pricedata) for pricedata in prices.values()]
+                df.insert(
+                    0,
+                    "target",
+                    pd.Categorical.from_codes(
+                        np.repeat(np.arange(len(counts)), counts),
+                        categories=pd.Index(list(prices), dtype=object),
+                    ),
+                )
+                exporter.write(df)
+
+        print(f"\nFile written: {filepath}")
+
+    @staticmethod
+    def get_coin_set_key(control: PriceController) -> str:
+        """Get a short key of the coins and currencies of a controller, for file names"""
+        coins = sorted(f"{coin.chain}:{coin.siteid}" for coin in control.get_coin_data())
+        currencies = sorted(control.get_currency_data())
+        text = ",".join(dict.fromkeys(coins)) + "|" + ",".join(currencies)
+        return hashlib.sha1(text.encode()).hexdigest()[:8]
+
+    def price_auto(
+        self, control: PriceController, date: str, mode: str, outputs: list[str]
+    ) -> int:
+        """Retrieve prices without user input and write them to every output
+
+        mode = now, hist (via marketchart), hist2 (only CoinGecko) or all
+        outputs = list with csv, xlsx, parquet and/or db
+        returns exit code: 0 ok, 1 no prices retrieved, 2 writing an output failed
+        """
+        price_functions = {
+            "now": lambda: self.price_current(control),
+            "hist": lambda: self.price_hist_marketchart(control, date),
+            "hist2": lambda: self.price_hist(control, date),
+        }
+        if mode == "all":
+            modes = list(price_functions)
+            if control.get_website() != DbWebsiteName.COINGECKO.name.lower():
+                modes.remove("hist2")
+        else:
+            modes = [mode]
+
+        exit_code = 0
+        for mode in modes:
+            price_functions[mode]()
+            if self.price_data == []:
+                print(f"No prices retrieved for {mode}", file=sys.stderr)
+                exit_code = max(exit_code, 1)
+                continue
+
+            for output in outputs:
+                match output:
+                    case "csv":
+                        ok = self.write_to_file(control, self.price_data, OutputFileType.CSV)
+                    case "xls" | "xlsx":
+                        ok = self.write_to_file(control, self.price_data, OutputFileType.XLSX)
+                    case "parquet":
+                        ok = self.write_to_file(control, self.price_data, OutputFileType.PARQUET)
+                    case "db":
+                        ok = self.save_to_db(control, self.price_data)
+                    case _:
+                        print(f"Unknown output {output!r}", file=sys.stderr)
+                        ok = False
+                if not ok:
+                    exit_code = 2
+
+        return exit_code
+
+    def str_to_filetype(self, data: str) -> OutputFileType:
+        """Get the output file type of a name, default csv"""
+        match data.lower():
+            case "xls" | "xlsx":
+                return OutputFileType.XLSX
+            case "parquet":
+                return OutputFileType.PARQUET
+            case _:
+                return OutputFileType.CSV
+
     def str_to_list(self, data: str) -> list[str]:
         """Make a list of string of values"""
         return re.split("[;,]", data)
@@ -236,6 +477,12 @@ class CoinPriceViewCli:
                     self.price_hist_marketchart(control, date)
                 case Command(command="hist" | "h"):
                     self.price_hist_marketchart(control, date)
+                case Command(
+                    command="backfill" | "b", arguments=[start, end, *rest]
+                ):
+                    step = rest[0] if rest else "day"
+                    filetype = self.str_to_filetype(rest[1] if len(rest) > 1 else "csv")
+                    self.price_backfill(control, start, end, step, filetype)
                 case Command(command="db"):
                     control.load_coin_data_db()
                 case Command(command="coin" | "c", arguments=[rest]):
@@ -253,10 +500,17 @@ class CoinPriceViewCli:
                     self.write_to_file(control, self.price_data, OutputFileType.XLSX)
                 case Command(command="csv"):
                     self.write_to_file(control, self.price_data, OutputFileType.CSV)
-                case Command(
-                    command="a" | "auto" | "all",
-                    arguments=["xls" | "csv" | "both", *rest],
-                ):
-                    pass
+                case Command(command="store"):
+                    self.save_to_db(control, self.price_data)
+                case Command(command="a" | "auto" | "all", arguments=arguments):
+                    outputs = []
+                    for argument in arguments:
+                        if argument in ["xls", "xlsx", "csv", "parquet", "db"]:
+                            outputs.append(argument)
+                        elif argument == "both":
+                            outputs.extend(["xlsx", "csv"])
+                        else:
+                            date = argument
+                    self.price_auto(control, date, "all", outputs or ["xlsx", "csv"])
                 case _:
                     print(f"Unknown command {cmd.command!r}, try again.")
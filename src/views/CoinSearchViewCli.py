@@ -1,7 +1,7 @@
 """
 @author: Arno
 @created: 2022-12-26
-@modified: 2023-05-20
+@modified: 2026-10-17
 
 Command editor UI for searching coins on website / exchanges
 
@@ -11,8 +11,6 @@ import sys
 from dataclasses import asdict
 from typing import Protocol
 
-import pandas as pd
-
 from src.data.CoinData import CoinData, CoinSearchData
 from src.data.CoinViewData import Command, SearchFunction
 from src.data.DbData import DbResultStatus
@@ -35,12 +33,24 @@ class SearchController(Protocol):
     def insert_coin(self, coin: CoinSearchData) -> DbResultStatus:
         ...
 
+    def delete_coins(self, coins: list[CoinData]) -> tuple[DbResultStatus, int]:
+        ...
+
+    def insert_coins(self, coins: list[CoinSearchData]) -> tuple[DbResultStatus, int]:
+        ...
+
     def toggle_search_method(self) -> None:
         ...
 
     def get_search_method(self) -> SearchMethod:
         ...
 
+    def toggle_search_regex(self) -> None:
+        ...
+
+    def get_search_regex(self) -> bool:
+        ...
+
 
 class CoinSearchViewCli:
     """UI class for searching in command editor
@@ -80,9 +90,40 @@ class CoinSearchViewCli:
             case DbResultStatus.INSERT_OK:
                 print(f'{coin.coin.name} added to the database')
 
+    def delete_coins(self, control: SearchController, coins: list[CoinData]) -> None:
+        """Try deleting all coins via controller and show result
+        """
+        result, nr = control.delete_coins(coins)
+        match result:
+            case DbResultStatus.NO_DATABASE:
+                print('No database connection')
+            case DbResultStatus.NO_TABLE:
+                print('Table not found')
+            case DbResultStatus.DELETE_ERROR:
+                print('Error deleting coins from database')
+            case DbResultStatus.DELETE_OK:
+                print(f'{nr} coins deleted from database')
+
+    def insert_coins(self, control: SearchController, coins: list[CoinSearchData]) -> None:
+        """Try inserting all coins via controller and show result
+        """
+        result, nr = control.insert_coins(coins)
+        match result:
+            case DbResultStatus.NO_DATABASE:
+                print('No database connection')
+            case DbResultStatus.COIN_EXISTS:
+                print('Database already has all coins')
+            case DbResultStatus.INSERT_ERROR:
+                print('Error adding coins to database')
+            case DbResultStatus.INSERT_OK:
+                print(f'{nr} coins added to the database')
+
     def print_items(self, items: list, heading_text: str, col_drop=[]):
         """Print search result to terminal
         """
+        # pandas is imported here, it takes most of the startup time of the program
+        import pandas as pd
+
         # init pandas displaying
         pd.set_option('display.max_rows', None)
         pd.set_option('display.max_columns', None)
@@ -131,9 +172,9 @@ class CoinSearchViewCli:
     def get_main_input_command(self, max_row: int) -> Command:
         """ The main user input
         """
-        message = '(N)ew search, (D)elete, (T)oggle search method or (Q)uit: '
+        message = '(N)ew search, (D)elete, (T)oggle search method, (R)egex or (Q)uit: '
         if max_row >= 0:
-            message = f'Select row nr for {self.last_fn.value}, or {message}'
+            message = f'Select row nr or (A)ll for {self.last_fn.value}, or {message}'
 
         input_str = input(message)
         if input_str == '':
@@ -169,9 +210,21 @@ class CoinSearchViewCli:
                     control.toggle_search_method()
                     print(
                         f'Search method set to: {control.get_search_method().name}')
+                case Command(command='regex' | 'r'):
+                    control.toggle_search_regex()
+                    print(
+                        f'Search with regular expression: {control.get_search_regex()}')
                 case Command(command='delete' | 'd'):
                     coindeletedata = self.ui_delete(control)
                     self.last_fn = SearchFunction.DELETE
+                case Command(command='all' | 'a'):
+                    match self.last_fn:
+                        case SearchFunction.INSERT:
+                            self.insert_coins(control, coinsearchdata)
+                        case SearchFunction.DELETE:
+                            self.delete_coins(control, coindeletedata)
+                        case _:
+                            print('No rows to select! Try again.')
                 case Command(command='quit' | 'q' | 'exit' | 'e', arguments=['--force' | '-f', *rest]):
                     print("Sending SIGTERM to all processes and quitting the program.")
                     sys.exit('Exiting')
@@ -0,0 +1,60 @@
+"""
+@author: Arno
+@created: 2026-10-17
+@modified: 2026-10-17
+
+Joining Coingecko responses to the requested coins must scale linearly
+
+"""
+import time
+
+import pytest
+
+import config
+from src.data.CoinData import CoinData
+
+CURRENCIES = ["usd", "eur", "btc"]
+
+
+def make_request(nr_coins: int) -> tuple[list[CoinData], list[dict]]:
+    """Coins and responses of one simple price request
+
+    Every 10th coin is requested twice, as in a portfolio with the same coin
+    on more accounts
+    """
+    coins = [CoinData(siteid=f"coin{nr}", name=f"Coin {nr}", symbol=f"c{nr}")
+             for nr in range(nr_coins)]
+    coins += [CoinData(siteid=coin.siteid, name=coin.name, symbol=coin.symbol)
+              for coin in coins[::10]]
+    resp = {f"coin{nr}": {"usd": 1.0, "eur": 0.9, "btc": 0.00001, "last_updated_at": 1700000000}
+            for nr in range(nr_coins)}
+    return coins, [resp]
+
+
+def time_join(coingecko, nr_coins: int) -> float:
+    """Best time of some runs of the join in sec"""
+    coins, resps = make_request(nr_coins)
+    prices = coingecko.convert_simple_price(coins, CURRENCIES, resps)
+    assert len(prices) == len(coins) * len(CURRENCIES)
+
+    times = []
+    for _ in range(5):
+        start = time.perf_counter()
+        coingecko.convert_simple_price(coins, CURRENCIES, resps)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+@pytest.fixture
+def coingecko(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "CACHE_PATH", str(tmp_path))
+    from src.models.CoinPriceCoingecko import CoinPriceCoingecko
+
+    return CoinPriceCoingecko()
+
+
+def test_join_scales_linear(coingecko):
+    time_1k = time_join(coingecko, 1_000)
+    time_10k = time_join(coingecko, 10_000)
+    # linear is about 10 times slower, quadratic would be 100 times
+    assert time_10k / time_1k < 30
@@ -0,0 +1,58 @@
+"""
+@author: Arno
+@created: 2026-10-17
+@modified: 2026-10-17
+
+Import time of the programs
+
+Heavy packages are imported only in the functions that use them, so the
+programs start fast. A new import at module level would undo this.
+"""
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# packages that may only be imported when used
+LAZY_MODULES = ["pandas", "numpy", "cfscrape", "psycopg2", "openpyxl", "pyarrow"]
+
+# maximum cumulative import time of a program in sec, generous for slow machines
+IMPORT_TIME_BUDGET = 2.0
+
+
+def import_program(program: str) -> tuple[float, list[str]]:
+    """Import a program in a new interpreter with -X importtime
+
+    returns cumulative import time of the program in sec,
+            list of the lazy modules that are loaded
+    """
+    code = (
+        f"import sys, json; import {program}; "
+        f"print(json.dumps([m for m in {LAZY_MODULES!r} if m in sys.modules]))"
+    )
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    # lines of stderr: 'import time: self [us] | cumulative | imported package'
+    cumulative_us = 0
+    for line in proc.stderr.splitlines():
+        parts = line.split("|")
+        if len(parts) == 3 and parts[2].strip() == program:
+            cumulative_us = int(parts[1])
+    return cumulative_us / 1_000_000, json.loads(proc.stdout.splitlines()[-1])
+
+
+@pytest.mark.parametrize("program", ["CoinPriceProg", "CoinSearchProg"])
+def test_import_time(program: str):
+    import_time, loaded = import_program(program)
+    assert loaded == [], f"{program} imports {loaded} at module level"
+    assert 0 < import_time < IMPORT_TIME_BUDGET
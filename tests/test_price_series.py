@@ -0,0 +1,90 @@
+"""
+@author: Arno
+@created: 2026-10-17
+@modified: 2026-10-17
+
+Price series of a coin between two dates, with responses of a fake Coingecko
+
+"""
+from urllib.parse import parse_qsl, urlparse
+
+import pytest
+
+import config
+from src.data.CoinData import CoinData
+
+HOUR = 3600
+DAY = 24 * HOUR
+
+
+def fake_market_chart(urls: list[str], fn_progress=None) -> list[dict]:
+    """Responses like market_chart/range, hourly points up to 90 days, daily above"""
+    resps = []
+    for url in urls:
+        params = dict(parse_qsl(urlparse(url).query))
+        ts_from, ts_to = int(params["from"]), int(params["to"])
+        step = HOUR if ts_to - ts_from <= 90 * DAY else DAY
+        timestamps = range(ts_from - ts_from % step + step, ts_to, step)
+        resps.append(
+            {
+                "status_code": 200,
+                "prices": [[ts * 1000, ts / HOUR] for ts in timestamps],
+                "total_volumes": [[ts * 1000, 24.0] for ts in timestamps],
+            }
+        )
+    return resps
+
+
+@pytest.fixture
+def coingecko(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "CACHE_PATH", str(tmp_path))
+    from src.models.CoinPriceCoingecko import CoinPriceCoingecko
+
+    cp = CoinPriceCoingecko()
+    cp.req.get_many = fake_market_chart
+    cp.attach_view_update_progress(lambda nr, total: None)
+    return cp
+
+
+def test_date_without_time_is_midnight(coingecko):
+    coin = CoinData(siteid="bitcoin", name="Bitcoin", symbol="btc")
+    df = coingecko.get_price_series(coin, "usd", "2023-1-1", "2023-1-3", "hour")
+    assert str(df["date"].iloc[0]) == "2023-01-01 00:00:00+00:00"
+    assert str(df["date"].iloc[-1]) == "2023-01-03 00:00:00+00:00"
+    assert len(df) == 49
+
+
+def test_week_resampled_from_days(coingecko):
+    coin = CoinData(siteid="bitcoin", name="Bitcoin", symbol="btc")
+    df = coingecko.get_price_series(coin, "usd", "2023-1-2", "2023-12-31", "week")
+    dates = df["date"]
+    assert (dates.dt.dayofweek == 0).all()
+    assert (dates.diff().dropna().dt.days == 7).all()
+    assert len(df) == 52
+
+
+def test_candles_volume_not_summed(coingecko):
+    """The rolling 24h volume of Coingecko is not added up per candle"""
+    coin = CoinData(siteid="bitcoin", name="Bitcoin", symbol="btc")
+    candles = coingecko.get_price_candles(coin, "usd", "2023-1-1", "2023-1-3", ["1d"])
+    df = candles["1d"]
+    assert list(df["volume"]) == [24.0, 24.0, 24.0]
+    assert str(df["date"].iloc[0]) == "2023-01-01 00:00:00+00:00"
+
+
+def test_candles_later_end_adds_to_kept_candles(coingecko):
+    coin = CoinData(siteid="bitcoin", name="Bitcoin", symbol="btc")
+    coingecko.get_price_candles(coin, "usd", "2023-1-1", "2023-1-3", ["4h"])
+    resampler = next(iter(coingecko.resamplers.values()))
+    first_candles = resampler.candles[4 * HOUR].copy()
+    ts_last = resampler.points[-1, 0]
+    added = []
+    add = resampler.add
+    resampler.add = lambda points: added.append(points[0, 0]) or add(points)
+
+    candles = coingecko.get_price_candles(coin, "usd", "2023-1-1", "2023-1-5", ["4h", "1d"])
+    assert len(coingecko.resamplers) == 1
+    assert added == [ts_last]  # only the points from the last known point
+    assert (resampler.candles[4 * HOUR][: len(first_candles) - 1] == first_candles[:-1]).all()
+    assert len(candles["4h"]) == 4 * 6 + 1
+    assert len(candles["1d"]) == 5